@@ -6,23 +6,64 @@ Este script:
 1. Crea un entorno virtual llamado 'envData'
 2. Actualiza pip a la última versión
 3. Instala el proyecto en modo editable (pip install -e .)
-4. Instala navegadores de Playwright
+4. Instala navegadores de Playwright (en paralelo con el paso 3)
 
 Uso:
     python build_venv.py
 """
 
 import os
-import sys
 import subprocess
+import venv
 
 VENV_NAME = "envData"
 
+# Version minima de pip; si el entorno ya la tiene no se consulta PyPI para actualizar
+MIN_PIP_VERSION = (24, 0)
+
+# Cache persistente de pip: en ejecuciones siguientes no se vuelven a descargar ni construir wheels
+PIP_ENV = os.environ.copy()
+PIP_ENV.setdefault("PIP_CACHE_DIR", os.path.expanduser("~/.cache/data_scraper_pip"))
+
 def run(cmd, description=""):
     """Ejecuta un comando y muestra descripción."""
     if description:
         print(f"\n→ {description}")
-    subprocess.check_call(cmd)
+    subprocess.check_call(cmd, env=PIP_ENV)
+
+def run_parallel(cmds):
+    """
+    Ejecuta varios comandos a la vez y espera a que terminen todos.
+    cmds: lista de tuplas (cmd, description).
+    Falla si alguno termina con error, igual que check_call.
+    """
+    procs = []
+    for cmd, description in cmds:
+        if description:
+            print(f"\n→ {description}")
+        procs.append((cmd, subprocess.Popen(cmd, env=PIP_ENV)))
+
+    for cmd, proc in procs:
+        proc.wait()
+    for cmd, proc in procs:
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+def pip_version(py):
+    """Retorna la version de pip del entorno como tupla de enteros, o None si no se puede leer."""
+    try:
+        out = subprocess.check_output(
+            [py, "-c", "import pip, sys; sys.stdout.write(pip.__version__)"], text=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    parts = []
+    for part in out.strip().split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts) or None
 
 def venv_python():
     """Retorna la ruta del ejecutable de Python del entorno virtual."""
@@ -36,26 +77,35 @@ def main():
     print("CONFIGURACIÓN AUTOMÁTICA DEL PROYECTO data_scraper")
     print("=" * 60)
     
-    # 1. Crear entorno virtual
+    # 1. Crear entorno virtual (en el mismo proceso, sin lanzar otro interprete)
     if not os.path.isdir(VENV_NAME):
-        run([sys.executable, "-m", "venv", VENV_NAME], 
-            f"Creando entorno virtual '{VENV_NAME}'...")
+        print(f"\n→ Creando entorno virtual '{VENV_NAME}'...")
+        venv.EnvBuilder(with_pip=True).create(VENV_NAME)
     else:
         print(f"\n→ Entorno virtual '{VENV_NAME}' ya existe (saltando creación)")
 
     py = venv_python()
 
-    # 2. Actualizar pip
-    run([py, "-m", "pip", "install", "--upgrade", "pip"], 
-        "Actualizando pip...")
+    # 2. Actualizar pip (solo si esta bajo la version minima)
+    current_pip = pip_version(py)
+    if current_pip is None or current_pip < MIN_PIP_VERSION:
+        run([py, "-m", "pip", "install", "--prefer-binary", "--upgrade", "pip"], 
+            "Actualizando pip...")
+    else:
+        print(f"\n→ pip {'.'.join(map(str, current_pip))} ya está actualizado (saltando actualización)")
 
-    # 3. Instalar proyecto en modo editable
-    run([py, "-m", "pip", "install", "-e", "."], 
-        "Instalando proyecto en modo editable (pip install -e .)...")
+    # 3. Instalar primero solo playwright para poder descargar los navegadores
+    run([py, "-m", "pip", "install", "--prefer-binary", "playwright"], 
+        "Instalando playwright...")
 
-    # 4. Instalar navegadores de Playwright
-    run([py, "-m", "playwright", "install"], 
-        "Instalando navegadores de Playwright...")
+    # 4. Instalar proyecto en modo editable y navegadores de Playwright en paralelo
+    # La descarga de navegadores es solo red y no depende del resto de paquetes
+    run_parallel([
+        ([py, "-m", "pip", "install", "--prefer-binary", "-e", "."],
+         "Instalando proyecto en modo editable (pip install -e .)..."),
+        ([py, "-m", "playwright", "install"],
+         "Instalando navegadores de Playwright..."),
+    ])
 
     # 5. Configurar nbstripout para limpiar notebooks automágicamente
     run([py, "-m", "nbstripout", "--install"], 
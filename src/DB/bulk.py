@@ -0,0 +1,159 @@
+# DB/bulk.py
+# Lecturas y escrituras masivas en MongoDB
+# 1) Agrupa operaciones en batches (MONGO_BULK_BATCH, default 1000)
+# 2) Envia cada batch con ordered=False: una ida a la DB por batch y sigue aunque una op falle
+# 3) bulk_upsert: upsert de documentos completos por una key (ej: slug)
+# 4) iter_docs: recorre un find con batch_size explicito (menos getMore que el default de 101 docs)
+# 5) iter_docs_prefetch: pide el siguiente batch mientras se procesa el actual
+# 6) run_agg: aggregate con batchSize, allowDiskUse y el mismo prefetch
+
+import queue
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import PyMongoError
+
+from src.DB.mongo import load_mongo_config
+
+# Documentos por ida a la DB al recorrer un find
+# Entre 500 y 2000 suele ser el punto dulce: pocas idas sin cargar batches enormes en memoria
+FIND_BATCH_SIZE = 500
+
+
+def _batches(items: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    # Corta un iterable en listas de a lo mas size elementos
+    # size < 1 no entregaria ningun batch (se perderian todas las ops): error explicito
+    if size < 1:
+        raise ValueError(f"batch size debe ser >= 1 (recibido {size})")
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_docs(collection: Collection, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, batch: int = FIND_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    # Itera los documentos de collection.find(filter, projection) con batch_size(batch)
+    # Sin batch_size PyMongo trae 101 docs en el primer batch y luego hasta 16 MiB por getMore
+    # Ojo: si cada documento toma mucho en procesarse, el cursor puede expirar en el servidor
+    # (10 min sin getMore); en ese caso conviene materializar con list(iter_docs(...))
+    # Ejemplo:
+    # for doc in iter_docs(platforms, {"operational.status": "active"}, {"_id": 0, "slug": 1}):
+    #     ...
+    with collection.find(filter or {}, projection).batch_size(batch) as cursor:
+        yield from cursor
+
+
+# Documentos por batch en aggregations (resultados suelen ser mas chicos que un find)
+AGG_BATCH_SIZE = 1000
+
+# Marca de fin para la cola del prefetch
+_DONE = object()
+
+
+def iter_docs_prefetch(collection: Collection, filter: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None, batch: int = FIND_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    # Igual que iter_docs, pero un thread lee el cursor por paginas de batch docs
+    # y las deja en una cola (max 2 paginas) mientras el caller procesa la actual
+    # Asi la latencia de getMore queda oculta detras del trabajo en Python
+    # Conviene cuando procesar cada documento toma tiempo (parseo, clasificacion, etc)
+    yield from _prefetch(lambda: collection.find(filter or {}, projection).batch_size(batch), batch)
+
+
+def run_agg(collection: Collection, pipeline: List[Dict[str, Any]], batch: int = AGG_BATCH_SIZE, project: Optional[Dict[str, Any]] = None, prefetch: bool = True, **options: Any) -> Iterator[Dict[str, Any]]:
+    # Ejecuta un aggregate con batchSize y allowDiskUse (los $group/$sort grandes pueden ir a disco)
+    # - project: si se entrega se agrega como ultima etapa $project para mandar menos bytes por la red
+    # - prefetch: lee el cursor en un thread (ver iter_docs_prefetch)
+    # - options: opciones extra de aggregate (ej: hint=[("slug", 1)])
+    # Ejemplo:
+    # run_agg(platforms, [{"$group": {"_id": "$operational.status", "count": {"$sum": 1}}}], project={"_id": 1, "count": 1})
+    stages = list(pipeline)
+    if project:
+        stages.append({"$project": project})
+
+    def _open():
+        return collection.aggregate(stages, batchSize=batch, allowDiskUse=True, **options)
+
+    if prefetch:
+        yield from _prefetch(_open, batch)
+    else:
+        with _open() as cursor:
+            yield from cursor
+
+
+def _prefetch(open_cursor: Callable[[], Any], batch: int) -> Iterator[Dict[str, Any]]:
+    # Motor comun del prefetch: open_cursor se llama dentro del thread
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=2)
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        # Espera espacio en la cola, pero abandona si el caller dejo de iterar
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _producer() -> None:
+        try:
+            with open_cursor() as cursor:
+                for page in _batches(cursor, batch):
+                    if not _put(page):
+                        return
+            _put(_DONE)
+        except Exception as e:
+            _put(e)
+
+    worker = threading.Thread(target=_producer, name="mongo-prefetch", daemon=True)
+    worker.start()
+    try:
+        while True:
+            page = pages.get()
+            if page is _DONE:
+                return
+            if isinstance(page, Exception):
+                raise page
+            yield from page
+    finally:
+        # Si el caller corta antes (break / excepcion) el thread cierra el cursor y termina
+        stop.set()
+
+
+def bulk_write_batched(collection: Collection, ops: Iterable[Any], batch: Optional[int] = None) -> Dict[str, int]:
+    # Envia ops (UpdateOne, InsertOne, ...) en batches con ordered=False
+    # Retorna los totales de todos los batches
+    # Ejemplo:
+    # bulk_write_batched(platforms, (UpdateOne({"slug": s}, {"$set": {...}}) for s in slugs))
+    size = batch or load_mongo_config().bulk_batch_size
+    totals = {"matched": 0, "modified": 0, "upserted": 0, "inserted": 0}
+
+    for chunk in _batches(ops, size):
+        res = collection.bulk_write(chunk, ordered=False)
+        totals["matched"] += res.matched_count
+        totals["modified"] += res.modified_count
+        totals["upserted"] += res.upserted_count
+        totals["inserted"] += res.inserted_count
+
+    return totals
+
+
+def bulk_upsert(collection: Collection, docs: Iterable[Dict[str, Any]], key: str, batch: Optional[int] = None) -> Dict[str, int]:
+    # Upsert masivo de documentos identificados por key
+    # Cada doc se convierte en UpdateOne({key: doc[key]}, {"$set": doc}, upsert=True)
+    # Crea (si no existe) un indice sobre key para que cada filtro sea un IXSCAN
+    # No se fuerza unique=True: puede haber duplicados previos (ver get_repeated_slugs)
+    try:
+        collection.create_index(key)
+    except PyMongoError:
+        pass
+
+    ops = (
+        UpdateOne({key: doc[key]}, {"$set": doc}, upsert=True)
+        for doc in docs
+    )
+    return bulk_write_batched(collection, ops, batch)
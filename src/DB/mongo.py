@@ -5,19 +5,23 @@
 # 3) Mantiene un MongoClient reutilizable en memoria
 # 4) Entrega get_db() para usar colecciones
 # 5) Permite ping y cierre limpio
+# 6) Entrega get_async_db() (Motor) para consultas concurrentes con asyncio
 
 import os
+import threading
 from dataclasses import dataclass
 from typing import Optional
 
 from pymongo import MongoClient
 from pymongo.database import Database
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv 
 
-#Habilitar a python para usar las variables de entorno
-load_dotenv(find_dotenv())
+# .env en la raiz del repo (src/DB/mongo.py -> parents[2])
+# Se carga una sola vez, en la primera lectura de la config (no al importar)
+_ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
 
 # Config simple para Mongo
 @dataclass(frozen=True)
@@ -25,10 +29,34 @@ class MongoConfig:
     uri: str
     db_name: str
     connect_timeout_ms: int = 10_000
+    max_pool_size: int = 200
+    min_pool_size: int = 1
+    app_name: str = "data_scraper"
+    server_selection_timeout_ms: int = 5_000
+    socket_timeout_ms: int = 30_000
+    wait_queue_timeout_ms: int = 10_000
+    # zstd requiere el paquete zstandard; si no esta, pymongo avisa y usa zlib
+    compressors: str = "zstd,zlib"
+    # Operaciones por bulk_write en src/DB/bulk.py
+    bulk_batch_size: int = 1000
 
 
 # Cache del cliente para no abrir conexiones repetidas
 _client: Optional[MongoClient] = None
+_async_client: Optional[AsyncIOMotorClient] = None
+_client_lock = threading.Lock()
+
+# Cache de la config: las variables de entorno se leen una sola vez por proceso
+_config: Optional[MongoConfig] = None
+
+
+def _get_int_env(name: str, default: str) -> int:
+    # Lee una variable de entorno entera
+    raw = os.getenv(name, default)
+    try:
+        return int(raw)
+    except ValueError as e:
+        raise RuntimeError(f"{name} debe ser un entero") from e
 
 
 def _get_env(name: str, default: Optional[str] = None) -> str:
@@ -45,6 +73,16 @@ def load_mongo_config() -> MongoConfig:
     # Ejemplo:
     # APP_ENV=dev  -> usa MONGO_URI_DEV y MONGO_DB_NAME_DEV
     # APP_ENV=prod -> usa MONGO_URI_PROD y MONGO_DB_NAME_PROD
+    # La primera llamada lee el entorno; las siguientes devuelven la misma config
+    # Usar reset_config() si cambian las variables de entorno (ej: tests)
+
+    global _config
+    if _config is not None:
+        return _config
+
+    #Habilitar a python para usar las variables de entorno
+    #Ruta fija si existe; si no, se busca hacia arriba como antes
+    load_dotenv(_ENV_PATH if _ENV_PATH.is_file() else find_dotenv())
 
     app_env = _get_env("APP_ENV", "dev").lower()
     suffix = app_env.upper()
@@ -52,29 +90,64 @@ def load_mongo_config() -> MongoConfig:
     uri = _get_env(f"MONGO_URI_{suffix}")
     db_name = _get_env(f"MONGO_DB_NAME_{suffix}")
 
-    timeout_raw = os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000")
-    try:
-        timeout = int(timeout_raw)
-    except ValueError as e:
-        raise RuntimeError("MONGO_CONNECT_TIMEOUT_MS debe ser un entero") from e
-
-    return MongoConfig(uri=uri, db_name=db_name, connect_timeout_ms=timeout)
+    timeout = _get_int_env("MONGO_CONNECT_TIMEOUT_MS", "10000")
+    max_pool = _get_int_env("MONGO_MAX_POOL_SIZE", "200")
+    min_pool = _get_int_env("MONGO_MIN_POOL_SIZE", "1")
+    server_selection = _get_int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")
+    socket_timeout = _get_int_env("MONGO_SOCKET_TIMEOUT_MS", "30000")
+    wait_queue = _get_int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")
+    bulk_batch = _get_int_env("MONGO_BULK_BATCH", "1000")
+    # Con 0 o negativo _batches no entrega ningun batch y las escrituras se perderian en silencio
+    if bulk_batch < 1:
+        raise RuntimeError("MONGO_BULK_BATCH debe ser mayor o igual a 1")
+
+    _config = MongoConfig(
+        uri=uri,
+        db_name=db_name,
+        connect_timeout_ms=timeout,
+        max_pool_size=max_pool,
+        min_pool_size=min_pool,
+        app_name=os.getenv("MONGO_APP_NAME", "data_scraper"),
+        server_selection_timeout_ms=server_selection,
+        socket_timeout_ms=socket_timeout,
+        wait_queue_timeout_ms=wait_queue,
+        compressors=os.getenv("MONGO_COMPRESSORS", "zstd,zlib"),
+        bulk_batch_size=bulk_batch,
+    )
+    return _config
+
+
+def _client_options(cfg: MongoConfig) -> dict:
+    # Opciones comunes de MongoClient y AsyncIOMotorClient
+    # Pool acotado + timeouts para fallar rapido ante problemas de red
+    # Compresion de red para los bulk_write / aggregations grandes
+    return {
+        "connectTimeoutMS": cfg.connect_timeout_ms,
+        "serverSelectionTimeoutMS": cfg.server_selection_timeout_ms,
+        "socketTimeoutMS": cfg.socket_timeout_ms,
+        "waitQueueTimeoutMS": cfg.wait_queue_timeout_ms,
+        "maxPoolSize": cfg.max_pool_size,
+        "minPoolSize": cfg.min_pool_size,
+        "appname": cfg.app_name,
+        "retryWrites": True,
+        "compressors": cfg.compressors,
+    }
 
 
 def get_client() -> MongoClient:
     # Devuelve un MongoClient singleton por proceso
     # Si ya existe devuelve el mismo
     # Si no existe crea uno usando la config del entorno actual
+    # El lock evita que dos threads creen clientes (y pools) distintos a la vez
 
     global _client
     if _client is not None:
         return _client
 
-    cfg = load_mongo_config()
-    _client = MongoClient(
-        cfg.uri,
-        connectTimeoutMS=cfg.connect_timeout_ms,
-    )
+    with _client_lock:
+        if _client is None:
+            cfg = load_mongo_config()
+            _client = MongoClient(cfg.uri, **_client_options(cfg))
     return _client
 
 
@@ -87,6 +160,30 @@ def get_db() -> Database:
     return get_client()[cfg.db_name]
 
 
+def get_async_client() -> AsyncIOMotorClient:
+    # Igual que get_client pero con Motor (driver async sobre pymongo)
+    # Permite lanzar muchas consultas a la vez con asyncio.gather
+
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+
+    with _client_lock:
+        if _async_client is None:
+            cfg = load_mongo_config()
+            _async_client = AsyncIOMotorClient(cfg.uri, **_client_options(cfg))
+    return _async_client
+
+
+def get_async_db() -> AsyncIOMotorDatabase:
+    # Devuelve la Database async apuntando a la DB del entorno
+    # Ejemplo de uso:
+    # adb = get_async_db()
+    # doc = await adb["platforms"].find_one({"slug": "reity"})
+    cfg = load_mongo_config()
+    return get_async_client()[cfg.db_name]
+
+
 def ping() -> bool:
     # Verifica conectividad rápida
     # True si responde
@@ -101,7 +198,32 @@ def ping() -> bool:
 def close_client() -> None:
     # Cierra el cliente si existe
     # Útil en scripts o al finalizar la app
-    global _client
-    if _client is not None:
-        _client.close()
-        _client = None
+    # Toma el mismo lock que get_client para no cerrar un cliente mientras otro thread lo crea
+    global _client, _async_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+        if _async_client is not None:
+            _async_client.close()
+            _async_client = None
+
+
+def close_async_client() -> None:
+    # Cierra solo el cliente Motor
+    # Motor queda ligado al event loop donde se uso por primera vez: llamar al terminar
+    # cada asyncio.run para que la siguiente corrida cree un cliente en su propio loop
+    global _async_client
+    with _client_lock:
+        if _async_client is not None:
+            _async_client.close()
+            _async_client = None
+
+
+def reset_config() -> None:
+    # Cierra los clientes y olvida la config cacheada
+    # La siguiente llamada a get_db() vuelve a leer las variables de entorno
+    # platforms_querys no guarda el cliente cerrado: su coleccion se vuelve a resolver sola
+    global _config
+    close_client()
+    _config = None
@@ -1,23 +1,241 @@
-from src.DB.mongo import get_db
-from typing import List, Dict, Any, Optional, Union
-from urllib.parse import urlparse
+from src.DB.mongo import get_db, get_async_db
+from src.DB.bulk import run_agg
+import asyncio
+import copy
+import re
+from typing import List, Dict, Any, Optional, Union, Iterator, Tuple
 from datetime import datetime, timezone
+from functools import lru_cache
+import threading
+from cachetools import TTLCache
+from pymongo import UpdateOne, ReturnDocument, ReadPreference
+from pymongo.read_concern import ReadConcern
+from pymongo.errors import PyMongoError
+from src.utils.domains import host_matches
 
 #Conectar con "platforms" dentro de las colecciones de la DB
-db = get_db()
-platforms = db["platforms"]
+#La conexion se abre recien en la primera consulta (no al importar el modulo)
+#La coleccion queda ligada al MongoClient actual: si close_client() / reset_config() lo
+#reemplazan, la siguiente consulta toma la coleccion del cliente nuevo (y asegura sus indices)
+_platforms_col = None
+_platforms_analytics_col = None
+
+def _platforms():
+    global _platforms_col
+    db = get_db()
+    col = _platforms_col
+    if col is None or col.database.client is not db.client or col.database.name != db.name:
+        col = db["platforms"]
+        _ready_indexes.clear()
+        _ensure_indexes(col)
+        _platforms_col = col
+    return col
+
+def _platforms_analytics():
+    # Misma coleccion para lecturas de tipo reporte (scans / aggregations sin escritura posterior):
+    # en un replica set se pueden servir desde un secundario y no cargan el primario.
+    global _platforms_analytics_col
+    col = _platforms()
+    cached = _platforms_analytics_col
+    if cached is None or cached[0] is not col:
+        cached = (col, col.with_options(
+            read_preference=ReadPreference.SECONDARY_PREFERRED,
+            read_concern=ReadConcern("local"),
+        ))
+        _platforms_analytics_col = cached
+    return cached[1]
+
+def __getattr__(name: str):
+    # Compatibilidad con `from src.DB.platforms_querys import platforms` / `db`
+    if name == "platforms":
+        return _platforms()
+    if name == "db":
+        return get_db()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Documentos por batch en los cursores que recorren toda la coleccion.
+# El default del driver (101 docs en el primer batch) obliga a muchos getMore.
+CURSOR_BATCH_SIZE = 5000
+
+# Filtro de strings con al menos un caracter no blanco (se evalua en el indice)
+NON_BLANK_REGEX = r"\S"
+
+# Indices confirmados en la coleccion (se llena en _ensure_indexes)
+_ready_indexes = set()
+
+# operational.status que excluye get_slugs_not_inactive y el indice que la cubre
+INACTIVE_STATUS = "inactive"
+STATUS_SLUG_INDEX = [("operational.status", 1), ("slug", 1)]
+
+# Host de una url: [scheme://][userinfo@][www.]host[:puerto][/?#...]
+# grupo 1 = scheme (None si no hay), grupo 2 = host sin puerto ni www.
+_HOST_RE = re.compile(r"(?:([^/?#]*)://)?(?:[^/?#]*@)?(?:www\.)?([^/?#:]*)")
+
+# Secciones de links/texts en un dataSource
+_DEFAULT_SECTIONS = ("head", "header", "main", "footer")
+ALLOWED_SECTIONS = frozenset(_DEFAULT_SECTIONS)
+
+# Projections y updates fijos: se arman una vez y se reutilizan en cada llamada (no modificarlos)
+# Solo slug (sin _id): la consulta {"slug": ...} se responde desde el indice de slug (covered)
+_PROJ_SLUG = {"_id": 0, "slug": 1}
+_PROJ_OPERATIONAL = {"_id": 0, "operational": 1}
+_PROJ_OPERATIONAL_UPDATED_AT = {"_id": 0, "operational.updatedAt": 1}
+_PROJ_PRIMARY_DOMAIN = {"_id": 0, "primaryDomain": 1}
+_PROJ_DATASOURCE_POS = {"_id": 0, "dataSources.$": 1}
+_PROJ_MOBILE_APPS = {"_id": 0, "mobileApps": 1}
+_PROJ_SOCIAL_PROFILES = {"_id": 0, "socialProfiles": 1}
+_PROJ_PAGE_ROUTES = {"_id": 0, "pageRoutes": 1}
+
+# Fecha actual del servidor como string ISO 8601 UTC (ej: 2025-01-31T12:00:00.000+00:00)
+_NOW_ISO_EXPR = {"$dateToString": {"date": "$$NOW", "format": "%Y-%m-%dT%H:%M:%S.%L+00:00", "timezone": "UTC"}}
+
+_UNSET_OPERATIONAL = {"$unset": {"operational": ""}}
+_UNSET_PRIMARY_DOMAIN = {"$unset": {"primaryDomain": ""}}
+_UNSET_DATASOURCE_FIELD = {
+    "role": {"$unset": {"dataSources.$.role": ""}},
+    "kind": {"$unset": {"dataSources.$.kind": ""}},
+}
+_UNSET_MOBILE_APPS = {"$unset": {"mobileApps": ""}}
+_UNSET_SOCIAL_PROFILES = {"$unset": {"socialProfiles": ""}}
+_UNSET_PAGE_ROUTES = {"$unset": {"pageRoutes": ""}}
+
+# Cache TTL de get_platform_by_slug
+PLATFORM_CACHE_ENABLED = True
+PLATFORM_CACHE_TTL = 30
+_platform_cache = TTLCache(maxsize=4096, ttl=PLATFORM_CACHE_TTL)
+_platform_cache_lock = threading.Lock()
+
+# Cache TTL de get_unique_slugs / get_unique_primary_domains, por (campo, include_empty)
+UNIQUE_VALUES_CACHE_TTL = 60
+_unique_values_cache = TTLCache(maxsize=16, ttl=UNIQUE_VALUES_CACHE_TTL)
+
+#########
+#INDEXES#
+#########
+
+def _ensure_indexes(col) -> None:
+    """
+    Crea los indices que usan las consultas de este modulo.
+    create_index es idempotente: si el indice ya existe no hace nada.
+    Si falla (permisos, DB no disponible) las consultas siguen funcionando sin indice.
+    Se llama desde _platforms() una vez por MongoClient.
+    """
+    try:
+        col.create_index("slug")
+        col.create_index("primaryDomain")
+        # (operational.status, slug) cubre get_slugs_not_inactive sin leer documentos
+        # y su prefijo sirve tambien para las consultas solo por operational.status
+        col.create_index(STATUS_SLUG_INDEX)
+        # Consultas posicionales $ sobre dataSources: {"slug": ..., "dataSources.url": ...}
+        col.create_index([("slug", 1), ("dataSources.url", 1)])
+        # Idem para upsert/remove de mobileApps y socialProfiles
+        col.create_index([("slug", 1), ("mobileApps.url", 1)])
+        col.create_index([("slug", 1), ("socialProfiles.url", 1)])
+    except PyMongoError:
+        pass
+
+    # Registra los indices que existen de verdad: hint() sobre un indice inexistente falla
+    try:
+        for info in col.index_information().values():
+            _ready_indexes.add(tuple((k, d) for k, d in info["key"]))
+    except PyMongoError:
+        pass
 
-def get_platform_by_slug(slug: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+def _hint_kwargs(field: str) -> Dict[str, Any]:
     """
-    Retorna un documento de plataforma por su slug.
+    kwargs para aggregate() con hint al indice simple del campo, si existe.
     """
-    return platforms.find_one({"slug": slug}, projection)
+    hint = _hint([(field, 1)])
+    return {"hint": hint} if hint else {}
+
+def _hint(keys: List[Tuple[str, int]]) -> Optional[List[Tuple[str, int]]]:
+    """
+    Retorna keys para usar como hint solo si ese indice existe (ver _ensure_indexes).
+    Asi se fuerza el plan por indice sin romper la consulta si el indice no se pudo crear.
+    """
+    _platforms()
+    return keys if tuple(keys) in _ready_indexes else None
+
+def get_platform_by_slug(slug: str, projection: Optional[Dict[str, Any]] = None, use_cache: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Retorna un documento de plataforma por su slug. Por defecto lee siempre desde la DB.
+
+    use_cache=True usa un cache en memoria con TTL (PLATFORM_CACHE_TTL segundos) por
+    (slug, projection): solo para lecturas repetidas del mismo slug que toleran datos viejos
+    (ej: un notebook que consulta la misma plataforma muchas veces). No usarlo cuando la
+    lectura decide una escritura.
+    Las funciones de escritura de este modulo invalidan el cache del slug, pero las escrituras
+    hechas por fuera (src/DB/bulk.py, writer.py, write_queue.py, update directos) no:
+    el documento cacheado puede tener hasta PLATFORM_CACHE_TTL segundos de antiguedad.
+    Cada llamada recibe su propia copia del documento cacheado (deepcopy): modificarla
+    no afecta al cache ni a otras llamadas.
+    Poner PLATFORM_CACHE_ENABLED = False para ignorar use_cache.
+    """
+    if not (PLATFORM_CACHE_ENABLED and use_cache):
+        return _platforms().find_one({"slug": slug}, projection)
+
+    try:
+        key = (slug, frozenset(projection.items()) if projection else None)
+        hash(key)
+    except TypeError:
+        # Projection con valores no hasheables (ej: $slice): sin cache
+        return _platforms().find_one({"slug": slug}, projection)
+
+    with _platform_cache_lock:
+        if key in _platform_cache:
+            return copy.deepcopy(_platform_cache[key])
+
+    doc = _platforms().find_one({"slug": slug}, projection)
+
+    with _platform_cache_lock:
+        _platform_cache[key] = doc
+    return copy.deepcopy(doc)
+
+async def aget_platform_by_slug(slug: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Version async (Motor) de get_platform_by_slug.
+    """
+    return await get_async_db()["platforms"].find_one({"slug": slug}, projection)
+
+async def aget_platforms_by_slugs(
+    slugs: List[str],
+    projection: Optional[Dict[str, Any]] = None,
+    return_exceptions: bool = False,
+) -> Dict[str, Any]:
+    """
+    Busca varias plataformas por slug de forma concurrente (asyncio.gather).
+    El tiempo total queda cerca de una sola ida a la DB en vez de la suma de todas.
+
+    Input
+    - return_exceptions: si es True, un slug que falla entrega su excepcion en vez de
+      cancelar la lectura del resto
+
+    Output
+    - dict {slug: documento, None o excepcion}, en el mismo orden de slugs
+    """
+    docs = await asyncio.gather(
+        *(aget_platform_by_slug(s, projection) for s in slugs),
+        return_exceptions=return_exceptions,
+    )
+    return dict(zip(slugs, docs))
 
 ######
 #SLUG#
 ######
 
-def get_all_slugs(include_empty: bool = False) -> List[str]:
+def iter_all_slugs(include_empty: bool = False, batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[str]:
+    """
+    Igual que get_all_slugs pero entrega los slugs uno a uno (generador).
+    Util para recorrer colecciones grandes sin cargar toda la lista en memoria.
+
+    Parametros
+    - include_empty: si es False filtra None y string vacio
+                     si es True no aplica ese filtro
+    - batch_size: cantidad de documentos que trae MongoDB por cada ida a la DB
+    """
+    yield from _iter_string_values("slug", include_empty, batch_size)
+
+def get_all_slugs(include_empty: bool = False, batch_size: int = CURSOR_BATCH_SIZE) -> List[str]:
     """
     Retorna todos los slugs desde la colección platforms.
     Este resultado puede incluir repetición si existen documentos con el mismo slug.
@@ -25,35 +243,17 @@ def get_all_slugs(include_empty: bool = False) -> List[str]:
     Parametros
     - include_empty: si es False filtra None y string vacio
                      si es True no aplica ese filtro
+    - batch_size: cantidad de documentos que trae MongoDB por cada ida a la DB
 
     Output
     - List[str] con slugs en el orden en que MongoDB los entrega
     """
-    query = {"slug": {"$exists": True}}
-    if not include_empty:
-        query = {"slug": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    projection = {"_id": 0, "slug": 1}
-
-    cursor = platforms.find(query, projection)
-
-    slugs = []
-    for doc in cursor:
-        slug = doc.get("slug")
-        if isinstance(slug, str):
-            if include_empty:
-                slugs.append(slug)
-            else:
-                slug2 = slug.strip()
-                if slug2:
-                    slugs.append(slug2)
-
-    return slugs
+    return list(iter_all_slugs(include_empty, batch_size))
 
 def get_unique_slugs(include_empty: bool = False) -> List[str]:
     """
-    Retorna todos los slugs unicos usando distinct.
-    Este enfoque es simple y rapido para listas unicas.
+    Retorna todos los slugs unicos usando aggregation.
+    El filtrado de tipo, el trim y la deduplicacion se hacen en MongoDB.
 
     Parametros
     - include_empty: si es False filtra None y string vacio
@@ -61,25 +261,9 @@ def get_unique_slugs(include_empty: bool = False) -> List[str]:
 
     Output
     - List[str] con slugs unicos
-      Nota: distinct no garantiza orden estable
+      Nota: $group no garantiza orden estable
     """
-    query = {"slug": {"$exists": True}}
-    if not include_empty:
-        query = {"slug": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    slugs_unique = platforms.distinct("slug", query)
-
-    out = []
-    for s in slugs_unique:
-        if isinstance(s, str):
-            if include_empty:
-                out.append(s)
-            else:
-                s2 = s.strip()
-                if s2:
-                    out.append(s2)
-
-    return out
+    return _unique_string_values("slug", include_empty)
 
 def get_repeated_slugs(include_empty: bool = False) -> List[Dict[str, Any]]:
 
@@ -98,56 +282,35 @@ def get_repeated_slugs(include_empty: bool = False) -> List[Dict[str, Any]]:
         ...
       ]
     """
-    match_stage = {"slug": {"$exists": True}}
-    if not include_empty:
-        match_stage = {"slug": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    pipeline = [
-        {"$match": match_stage},
-        {"$group": {"_id": "$slug", "count": {"$sum": 1}}},
-        {"$match": {"count": {"$gt": 1}}},
-        {"$sort": {"count": -1, "_id": 1}},
-        {"$project": {"_id": 0, "slug": "$_id", "count": 1}},
-    ]
+    return list(run_agg(_platforms_analytics(), _REPEATED_PIPELINES[("slug", bool(include_empty))], prefetch=False, **_hint_kwargs("slug")))
 
-    result = list(platforms.aggregate(pipeline))
-
-    if include_empty:
-        return result
-
-    out = []
-    for row in result:
-        slug = row.get("slug")
-        count = row.get("count")
-        if isinstance(slug, str) and isinstance(count, int):
-            slug2 = slug.strip()
-            if slug2:
-                out.append({"slug": slug2, "count": count})
-
-    return out
+def iter_slugs_not_inactive(batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[str]:
+    """
+    Igual que get_slugs_not_inactive pero entrega los slugs uno a uno (generador).
+    En memoria queda solo un batch del cursor, no la lista completa.
+    """
+    # $ne sobre un campo indexado se resuelve como dos rangos del indice
+    # [MinKey, "inactive") y ("inactive", MaxKey] (incluye null/campo ausente).
+    # No se usa $in con los status conocidos porque operational.status no tiene enum cerrado
+    # y se perderian plataformas con otros valores.
+    match = {"operational.status": {"$ne": INACTIVE_STATUS}}
+    yield from _iter_string_values("slug", False, batch_size, match, hint=_hint(STATUS_SLUG_INDEX))
 
-def get_slugs_not_inactive() -> List[str]:
+def get_slugs_not_inactive(batch_size: int = CURSOR_BATCH_SIZE) -> List[str]:
     """
     Retorna todos los slugs de plataformas cuyo operational.status NO es 'inactive'.
     Incluye documentos con status distinto a 'inactive' y documentos donde el campo no existe.
 
+    La consulta solo toca operational.status y slug, asi que MongoDB la resuelve
+    desde el indice compuesto (operational.status, slug) sin leer los documentos.
+
+    Parametros
+    - batch_size: cantidad de documentos que trae MongoDB por cada ida a la DB
+
     Output
     - List[str] con slugs.
     """
-    query = {"operational.status": {"$ne": "inactive"}}
-    projection = {"_id": 0, "slug": 1}
-
-    cursor = platforms.find(query, projection)
-
-    slugs = []
-    for doc in cursor:
-        slug = doc.get("slug")
-        if isinstance(slug, str):
-            slug2 = slug.strip()
-            if slug2:
-                slugs.append(slug2)
-
-    return slugs
+    return list(iter_slugs_not_inactive(batch_size))
 
 
 
@@ -177,86 +340,58 @@ def manage_operational_status(slug: str, action: str = "get", status: Optional[s
 
     # --- GET ---
     if action_norm == "get":
-        doc = platforms.find_one(query, {"_id": 0, "operational": 1})
+        doc = _platforms().find_one(query, _PROJ_OPERATIONAL)
         if not doc:
             return None
         return doc.get("operational")
 
     # --- DELETE ---
     if action_norm in {"delete", "remove", "unset"}:
-        update = {"$unset": {"operational": ""}}
-        res = platforms.update_one(query, update)
+        update = _UNSET_OPERATIONAL
+        res = _platforms().update_one(query, update)
+        _invalidate_platform_cache(slug)
         return {"matched": res.matched_count, "modified": res.modified_count}
 
     # --- SET / UPDATE ---
     if action_norm in {"set", "update"}:
-        # 1. Leer estado actual para comparar
-        doc = platforms.find_one(query, {"operational": 1})
-        if not doc:
-            # Si la plataforma no existe, no podemos hacer update (matched=0)
-            return {"matched": 0, "modified": 0, "message": "Platform not found"}
-
-        current_op = doc.get("operational") or {}
-        
-        # 2. Determinar nuevos valores
-        # Si el input es None, mantenemos el valor actual.
-        # Si el current no tiene el field, y el input es None, remains None (pero al crear el objeto, quizas queramos guardar null o no guardar la keys. Segun modelo, son strings opcionales, pero status tiene enum).
-        
-        target_status = status if status is not None else current_op.get("status")
-        target_notes = notes if notes is not None else current_op.get("notes")
-        
-        # 3. Comparar con lo existente
-        # Verificamos igualdad estricta.
-        # Ojo: si current_op vacio (ej. primera vez), y inputs None, target sera None.
-        
-        old_status = current_op.get("status")
-        old_notes = current_op.get("notes")
-
-        # Flag de cambio
-        has_changes = False
-        
-        # Si no existia operational, y ahora vamos a escribir algo, cuenta como cambio (creacion)
-        # PERO si target_status es None y target_notes es None, quizas no queremos crear un operational vacio?
-        # Asumiremos que si se llama a set, se intuye intencion de crear/actualizar datos.
-        # Aunque si status y notes son None, solo se actualizaria updatedAt? Eso podria ser valido "confirmacion de estado".
-        # PERO el requerimiento dice: "Si no se entrega status y/o notes... no hay que modificar... La falta de datos implica que no hay que hacer ningun cambio... no hay que actualizar fecha"
-        
-        if "operational" not in doc:
-            # Creando desde cero
-            has_changes = True
-        else:
-            # Ya existe, comparamos campos
-            if target_status != old_status:
-                has_changes = True
-            if target_notes != old_notes:
-                has_changes = True
-        
-        if not has_changes:
-            return {"matched": 1, "modified": 0, "message": "No changes needed"}
-
-        # 4. Preparar update
-        now_str = datetime.now(timezone.utc).isoformat()
-        
-        # Construimos el objeto operational completo o usamos dot notation?
-        # Dot notation es mas seguro para preservar otros fields si existieran (el modelo no muestra mas, pero por si acaso).
-        # Sin embargo, queremos asegurar que si status es None y antes no existia, no lo escribamos?
-        # Simplificacion: $set de campos individuales.
-        
+        # Una sola escritura condicional: el filtro solo calza si hay algo que cambiar.
+        # - operational no existe -> creacion
+        # - status/notes entregados y distintos a los guardados
+        # Si status o notes es None se mantiene el valor previo (no entra al filtro ni al $set).
+        # Si no se entrega nada y operational ya existe, no hay cambios ni se actualiza la fecha.
+        change_conds = [{"operational": {"$exists": False}}]
+        if status is not None:
+            change_conds.append({"operational.status": {"$ne": status}})
+        if notes is not None:
+            change_conds.append({"operational.notes": {"$ne": notes}})
+
+        # updatedAt lo pone el servidor ($$NOW) como string ISO, igual formato que el resto del modelo.
+        # Update con pipeline: los valores van con $literal para que no se lean como expresiones.
         update_fields = {
-            "operational.updatedAt": now_str
+            "operational.updatedAt": _NOW_ISO_EXPR
         }
-        if target_status is not None:
-            update_fields["operational.status"] = target_status
-        if target_notes is not None:
-            update_fields["operational.notes"] = target_notes
-
-        # Caso borde: si queriamos borrar status pasando None? 
-        # La funcion dice "si status es None, mantiene el valor previo".
-        # Si quisiéramos borrar un valor especifico, necesitariamos otro mecanismo o asumir string vacio = borrar.
-        # Por ahora nos apegamos a "None = no tocar".
-            
-        res = platforms.update_one(query, {"$set": update_fields})
-        return {"matched": res.matched_count, "modified": res.modified_count, "updatedAt": now_str}
+        if status is not None:
+            update_fields["operational.status"] = {"$literal": status}
+        if notes is not None:
+            update_fields["operational.notes"] = {"$literal": notes}
+
+        doc = _platforms().find_one_and_update(
+            {**query, "$or": change_conds},
+            [{"$set": update_fields}],
+            projection=_PROJ_OPERATIONAL_UPDATED_AT,
+            return_document=ReturnDocument.AFTER,
+        )
+
+        if doc is None:
+            # Segunda consulta solo en el camino sin cambios: distingue "no existe" de "sin cambios".
+            # Es covered por el indice de slug: no lee ni transfiere el documento ni operational.
+            if _platforms().find_one(query, _PROJ_SLUG) is None:
+                return {"matched": 0, "modified": 0, "message": "Platform not found"}
+            return {"matched": 1, "modified": 0, "message": "No changes needed"}
+
+        _invalidate_platform_cache(slug)
+        # El filtro solo calza si habia algo que cambiar, asi que matched implica modified
+        return {"matched": 1, "modified": 1, "updatedAt": doc["operational"]["updatedAt"]}
 
     raise ValueError("action no valido. Usa get, set, delete")
 
@@ -265,84 +400,30 @@ def manage_operational_status(slug: str, action: str = "get", status: Optional[s
 #PRIMARY DOMAINS#
 #################
 
-def get_all_primary_domains(include_empty: bool = False) -> List[str]:
+def iter_all_primary_domains(include_empty: bool = False, batch_size: int = CURSOR_BATCH_SIZE) -> Iterator[str]:
+    """
+    Igual que get_all_primary_domains pero entrega los primaryDomain uno a uno (generador).
+    """
+    yield from _iter_string_values("primaryDomain", include_empty, batch_size)
+
+def get_all_primary_domains(include_empty: bool = False, batch_size: int = CURSOR_BATCH_SIZE) -> List[str]:
     """
     Retorna todos los primaryDomain desde la colección platforms.
     Este resultado puede incluir repetición si existen documentos con el mismo primaryDomain.
     """
-    query = {"primaryDomain": {"$exists": True}}
-    if not include_empty:
-        query = {"primaryDomain": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    projection = {"_id": 0, "primaryDomain": 1}
-    cursor = platforms.find(query, projection)
-
-    out = []
-    for doc in cursor:
-        pd = doc.get("primaryDomain")
-        if isinstance(pd, str):
-            if include_empty:
-                out.append(pd)
-            else:
-                pd2 = pd.strip()
-                if pd2:
-                    out.append(pd2)
-
-    return out
+    return list(iter_all_primary_domains(include_empty, batch_size))
 
 def get_unique_primary_domains(include_empty: bool = False) -> List[str]:
     """
-    Retorna primaryDomain unicos usando distinct.
+    Retorna primaryDomain unicos usando aggregation.
     """
-    query = {"primaryDomain": {"$exists": True}}
-    if not include_empty:
-        query = {"primaryDomain": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    values = platforms.distinct("primaryDomain", query)
-
-    out = []
-    for v in values:
-        if isinstance(v, str):
-            if include_empty:
-                out.append(v)
-            else:
-                v2 = v.strip()
-                if v2:
-                    out.append(v2)
-
-    return out
+    return _unique_string_values("primaryDomain", include_empty)
 
 def get_repeated_primary_domains(include_empty: bool = False) -> List[Dict[str, Any]]:
     """
     Retorna primaryDomain repetidos con su count usando aggregation.
     """
-    match_stage = {"primaryDomain": {"$exists": True}}
-    if not include_empty:
-        match_stage = {"primaryDomain": {"$exists": True, "$ne": None, "$ne": ""}}
-
-    pipeline = [
-        {"$match": match_stage},
-        {"$group": {"_id": "$primaryDomain", "count": {"$sum": 1}}},
-        {"$match": {"count": {"$gt": 1}}},
-        {"$sort": {"count": -1, "_id": 1}},
-        {"$project": {"_id": 0, "primaryDomain": "$_id", "count": 1}},
-    ]
-
-    result = list(platforms.aggregate(pipeline))
-
-    if include_empty:
-        return result
-
-    out = []
-    for row in result:
-        pd = row.get("primaryDomain")
-        count = row.get("count")
-        if isinstance(pd, str) and isinstance(count, int):
-            pd2 = pd.strip()
-            if pd2:
-                out.append({"primaryDomain": pd2, "count": count})
-
-    return out
+    return list(run_agg(_platforms_analytics(), _REPEATED_PIPELINES[("primaryDomain", bool(include_empty))], prefetch=False, **_hint_kwargs("primaryDomain")))
 
 
 def manage_primary_domain(slug: str, action: str = "get", domain: Optional[str] = None) -> Union[str, Dict[str, int], None]:
@@ -363,13 +444,15 @@ def manage_primary_domain(slug: str, action: str = "get", domain: Optional[str]
 
     # --- GET ---
     if action_norm == "get":
-        doc = platforms.find_one(query, {"_id": 0, "primaryDomain": 1})
+        doc = _platforms().find_one(query, _PROJ_PRIMARY_DOMAIN)
         return doc.get("primaryDomain") if doc else None
 
     # --- DELETE ---
     if action_norm in {"delete", "remove", "unset"}:
-        update = {"$unset": {"primaryDomain": ""}}
-        res = platforms.update_one(query, update)
+        update = _UNSET_PRIMARY_DOMAIN
+        res = _platforms().update_one(query, update)
+        _invalidate_platform_cache(slug)
+        _invalidate_unique_values_cache("primaryDomain")
         return {"matched": res.matched_count, "modified": res.modified_count}
 
     # --- SET ---
@@ -378,7 +461,9 @@ def manage_primary_domain(slug: str, action: str = "get", domain: Optional[str]
             raise ValueError("domain debe ser un string para action set")
             
         update = {"$set": {"primaryDomain": domain.strip()}}
-        res = platforms.update_one(query, update)
+        res = _platforms().update_one(query, update)
+        _invalidate_platform_cache(slug)
+        _invalidate_unique_values_cache("primaryDomain")
         return {"matched": res.matched_count, "modified": res.modified_count}
 
     raise ValueError("action no valido. Usa get, set, delete")
@@ -394,8 +479,8 @@ def get_datasource_by_url(slug: str, datasource_url: str, projection: Optional[D
     Usa la proyección posicional $ si no se especifica otra.
     """
     if projection is None:
-        projection = {"_id": 0, "dataSources.$": 1}
-    return platforms.find_one({"slug": slug, "dataSources.url": datasource_url}, projection)
+        projection = _PROJ_DATASOURCE_POS
+    return _platforms().find_one({"slug": slug, "dataSources.url": datasource_url}, projection)
 
 #URLS
 def get_unique_datasource_urls(slug: str) -> list[str]:
@@ -406,30 +491,23 @@ def get_unique_datasource_urls(slug: str) -> list[str]:
     """
     Pipeline
     1) match: selecciona el documento de la plataforma por slug
-    2) unwind: expande el array dataSources para procesar cada elemento por separado
-    3) match: filtra dataSources.url validas (existe, no None, no vacio)
-    4) group: agrupa por slug y deduplica urls con addToSet
-    5) project: deja solo el campo uniqueUrls en el resultado final
+    2) project: deduplica dataSources.url validas (no None, no vacio) dentro del mismo documento
+       con $setUnion, sin $unwind ni $group
     """
     pipeline = [
         {"$match": {"slug": slug}},
-        {"$unwind": "$dataSources"},
-        {"$match": {"dataSources.url": {"$exists": True, "$ne": None, "$ne": ""}}},
-        {"$group": {"_id": "$slug", "uniqueUrls": {"$addToSet": "$dataSources.url"}}},
-        {"$project": {"_id": 0, "uniqueUrls": 1}},
+        {"$project": {"_id": 0, "uniqueUrls": {"$setUnion": [_valid_datasource_urls_expr(), []]}}},
     ]
 
     """
     Ejecuta el pipeline en MongoDB.
-    aggregate retorna una lista con 0 o 1 elementos porque agrupamos por slug.
+    Normalmente hay un solo documento por slug; si hubiera mas, se unen sus urls.
     """
-    result = list(platforms.aggregate(pipeline))
+    result = list(_platforms_analytics().aggregate(pipeline))
 
-    """
-    Si existe resultado, retornamos la lista uniqueUrls.
-    Si no existe, retornamos lista vacia.
-    """
-    return result[0]["uniqueUrls"] if result else []
+    if len(result) == 1:
+        return result[0]["uniqueUrls"]
+    return list({u for d in result for u in d["uniqueUrls"]})
 
 def get_repeated_datasource_urls(slug: str) -> list[dict]:
     """
@@ -439,35 +517,39 @@ def get_repeated_datasource_urls(slug: str) -> list[dict]:
     """
     Pipeline
     1) match: selecciona el documento de la plataforma por slug
-    2) unwind: expande el array dataSources para procesar cada elemento por separado
-    3) match: filtra dataSources.url validas (existe, no None, no vacio)
-    4) group: agrupa por url y cuenta ocurrencias
-    5) match: deja solo urls con count mayor a 1
-    6) sort: ordena por count desc y luego por url asc
-    7) project: formatea el output final como { url, count }
+    2) project: para cada url unica del documento cuenta sus apariciones ($map + $filter),
+       sin $unwind ni $group
+    Luego en Python: suma por url (si hubiera mas de un documento con el slug),
+    deja solo count mayor a 1 y ordena por count desc y luego por url asc.
     """
     pipeline = [
         {"$match": {"slug": slug}},
-        {"$unwind": "$dataSources"},
-        {"$match": {"dataSources.url": {"$exists": True, "$ne": None, "$ne": ""}}},
-        {"$group": {"_id": "$dataSources.url", "count": {"$sum": 1}}},
-        {"$match": {"count": {"$gt": 1}}},
-        {"$sort": {"count": -1, "_id": 1}},
-        {"$project": {"_id": 0, "url": "$_id", "count": 1}},
+        {"$project": {"_id": 0, "urls": _valid_datasource_urls_expr()}},
+        {"$project": {"counts": {"$map": {
+            "input": {"$setUnion": ["$urls", []]},
+            "as": "u",
+            "in": {
+                "url": "$$u",
+                "count": {"$size": {"$filter": {"input": "$urls", "as": "x", "cond": {"$eq": ["$$x", "$$u"]}}}},
+            },
+        }}}},
     ]
 
-    """
-    Ejecuta el pipeline en MongoDB.
-    Retorna lista vacia si no hay urls repetidas.
-    """
-    return list(platforms.aggregate(pipeline))
+    counts: Dict[str, int] = {}
+    for doc in _platforms_analytics().aggregate(pipeline):
+        for row in doc["counts"]:
+            counts[row["url"]] = counts.get(row["url"], 0) + row["count"]
+
+    repeated = [{"url": u, "count": c} for u, c in counts.items() if c > 1]
+    repeated.sort(key=lambda r: (-r["count"], r["url"]))
+    return repeated
 
 def unique_platform_urls_from_primary_domain(slug: str, mode: str = "loose") -> list[str]:
     """
     Busca la plataforma por slug y retorna una lista unica de urls de dataSources.url
     que pertenecen al primaryDomain.
     """
-    doc = platforms.find_one(
+    doc = _platforms().find_one(
         {"slug": slug},
         {"_id": 0, "primaryDomain": 1, "dataSources.url": 1}
     )
@@ -478,6 +560,15 @@ def unique_platform_urls_from_primary_domain(slug: str, mode: str = "loose") ->
     primary_domain = doc.get("primaryDomain") or ""
     data_sources = doc.get("dataSources") or []
 
+    # Todo lo que depende solo de primaryDomain se calcula una vez fuera del loop
+    # (misma regla que _belongs_to_platform)
+    pd_host = _to_host(primary_domain)
+    if not pd_host:
+        return []
+    pd_suffix = "." + pd_host
+    base_label = pd_host.split(".", 1)[0]
+    loose = mode != "strict" and bool(base_label)
+
     unique = set()
 
     for ds in data_sources:
@@ -489,7 +580,10 @@ def unique_platform_urls_from_primary_domain(slug: str, mode: str = "loose") ->
         u = u.strip()
         if not u:
             continue
-        if _belongs_to_platform(u, primary_domain, mode=mode):
+        h = _to_host(u)
+        if not h:
+            continue
+        if h == pd_host or h.endswith(pd_suffix) or (loose and base_label in h.split(".")):
             unique.add(u)
 
     return sorted(unique)
@@ -513,26 +607,9 @@ def get_links_from_platform_datasource(slug: str, datasource_url: str, sections=
     if not sections_norm:
         return []
 
-    doc = platforms.find_one(
-        {"slug": slug, "dataSources.url": datasource_url},
-        {"_id": 0, "dataSources.$": 1}
-    )
-
-    if not doc or "dataSources" not in doc or not doc["dataSources"]:
-        return []
-
-    ds = doc["dataSources"][0]
-    links_obj = ds.get("links") if isinstance(ds, dict) else None
-    if not isinstance(links_obj, dict):
-        return []
-
-    collected = []
-    for section in sections_norm:
-        lst = links_obj.get(section)
-        if isinstance(lst, list):
-            collected.extend(lst)
+    collected = _collect_datasource_sections(slug, datasource_url, "links", sections_norm)
 
-    return _unique_preserve_order(collected)
+    return _unique_preserve_order_fast(collected)
 
 #TEXTS
 def get_texts_from_platform_datasource(slug: str, datasource_url: str, sections=None, dedupe: bool = True) -> list[str]:
@@ -555,35 +632,12 @@ def get_texts_from_platform_datasource(slug: str, datasource_url: str, sections=
     if not sections_norm:
         return []
 
-    doc = platforms.find_one(
-        {"slug": slug, "dataSources.url": datasource_url},
-        {"_id": 0, "dataSources.$": 1}
-    )
-
-    if not doc or "dataSources" not in doc or not doc["dataSources"]:
-        return []
-
-    ds = doc["dataSources"][0]
-    texts_obj = ds.get("texts") if isinstance(ds, dict) else None
-    if not isinstance(texts_obj, dict):
-        return []
-
-    collected = []
-    for section in sections_norm:
-        lst = texts_obj.get(section)
-        if isinstance(lst, list):
-            collected.extend(lst)
+    collected = _collect_datasource_sections(slug, datasource_url, "texts", sections_norm)
 
     if dedupe:
-        return _unique_preserve_order(collected)
+        return _unique_preserve_order_fast(collected)
 
-    out = []
-    for t in collected:
-        if isinstance(t, str):
-            t2 = t.strip()
-            if t2:
-                out.append(t2)
-    return out
+    return collected
 
 #ROLE
 def datasource_role(slug: str, datasource_url: str, action: str = "get", role: str | None = None):
@@ -606,49 +660,141 @@ def datasource_role(slug: str, datasource_url: str, action: str = "get", role: s
     - action "get": str o None
     - action "set" o "update" o "delete": dict con matched y modified
     """
+    return _datasource_field("role", slug, datasource_url, action, role)
+
+def datasource_role_bulk(items: List[Tuple[str, str, str]]) -> Dict[str, int]:
     """
-    Query base
-    Encuentra el documento por slug y el elemento de dataSources por url.
+    Setea dataSources.role para muchos dataSources en una sola ida a la DB (bulk_write).
+
+    Input
+    - items: lista de tuplas (slug, datasource_url, role)
+
+    Output
+    - dict con matched y modified totales
     """
-    query = {"slug": slug, "dataSources.url": datasource_url}
+    return _datasource_field_bulk("role", items)
 
-    action_norm = (action or "").strip().lower()
+async def adatasource_role_bulk(items: List[Tuple[str, str, str]]) -> Dict[str, int]:
+    """
+    Version async (Motor) de datasource_role_bulk.
+    """
+    return await _adatasource_field_bulk("role", items)
 
-    if action_norm == "get":
-        """
-        Lee solo el elemento de dataSources que matchea usando projection posicional.
-        """
-        doc = platforms.find_one(query, {"_id": 0, "dataSources.$": 1})
-        if not doc:
-            return None
+def get_datasource_roles(slug: str, role: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Retorna [{"url": ..., "role": ...}] de los dataSources de una plataforma, en orden.
+    El filtrado corre en MongoDB ($filter + $map): solo viajan url y role de los que calzan.
 
-        ds_list = doc.get("dataSources") or []
-        if not ds_list or not isinstance(ds_list[0], dict):
-            return None
+    Input
+    - slug: slug de la plataforma
+    - role: si se entrega, solo los dataSources con ese role
 
-        return ds_list[0].get("role")
+    Output
+    - lista de dicts; url con trim, role None si no existe. Solo urls string no vacias
+    """
+    cond = [
+        {"$eq": [{"$type": "$$d.url"}, "string"]},
+        {"$ne": [{"$trim": {"input": "$$d.url"}}, ""]},
+    ]
+    if role is not None:
+        cond.append({"$eq": ["$$d.role", {"$literal": role}]})
 
-    if action_norm in {"set", "update"}:
-        """
-        Valida role
-        Setea dataSources.$.role en el elemento encontrado.
-        """
-        if not isinstance(role, str) or not role.strip():
-            raise ValueError("role debe ser un string no vacio para action set o update")
-
-        update = {"$set": {"dataSources.$.role": role.strip()}}
-        res = platforms.update_one(query, update)
-        return {"matched": res.matched_count, "modified": res.modified_count}
+    pipeline = [
+        {"$match": {"slug": slug}},
+        {"$limit": 1},
+        {"$project": {"_id": 0, "items": {"$map": {
+            "input": {"$filter": {
+                "input": {"$cond": [{"$isArray": "$dataSources"}, "$dataSources", []]},
+                "as": "d",
+                "cond": {"$and": cond},
+            }},
+            "as": "d",
+            "in": {"url": {"$trim": {"input": "$$d.url"}}, "role": {"$ifNull": ["$$d.role", None]}},
+        }}}},
+    ]
 
-    if action_norm in {"delete", "unset", "remove"}:
-        """
-        Elimina el campo role del elemento encontrado.
-        """
-        update = {"$unset": {"dataSources.$.role": ""}}
-        res = platforms.update_one(query, update)
-        return {"matched": res.matched_count, "modified": res.modified_count}
+    doc = next(_platforms().aggregate(pipeline), None)
+    if not doc:
+        return []
+    return doc["items"]
 
-    raise ValueError("action no valido. Usa get, set, update, delete")
+def get_unroled_datasources(slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Retorna primaryDomain y solo los dataSources SIN role (solo su url), filtrados en MongoDB.
+    Los ya clasificados no viajan por la red; solo se cuentan.
+
+    Output
+    - None si no existe la plataforma
+    - {"primaryDomain": str|None, "dataSources": [{"url": ...}], "roledCount": int}
+    """
+    return next(_platforms().aggregate(_unroled_datasources_pipeline(slug)), None)
+
+async def aget_unroled_datasources(slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Version async (Motor) de get_unroled_datasources.
+    """
+    docs = await get_async_db()["platforms"].aggregate(_unroled_datasources_pipeline(slug)).to_list(length=1)
+    return docs[0] if docs else None
+
+def _unroled_datasources_pipeline(slug: str) -> List[Dict[str, Any]]:
+    """
+    Pipeline comun de get_unroled_datasources y aget_unroled_datasources.
+    """
+    ds = {"$cond": [{"$isArray": "$dataSources"}, "$dataSources", []]}
+    missing_role = {"$eq": [{"$ifNull": ["$$d.role", None]}, None]}
+
+    return [
+        {"$match": {"slug": slug}},
+        {"$limit": 1},
+        {"$project": {
+            "_id": 0,
+            "primaryDomain": 1,
+            "dataSources": {"$map": {
+                "input": {"$filter": {"input": ds, "as": "d", "cond": missing_role}},
+                "as": "d",
+                "in": {"url": "$$d.url"},
+            }},
+            "roledCount": {"$size": {"$filter": {"input": ds, "as": "d", "cond": {"$not": [missing_role]}}}},
+        }},
+    ]
+
+def datasource_role_clear(slug: str, roles: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Elimina dataSources.role de todos los dataSources de una plataforma en un solo update_one.
+    Usa arrayFilters: MongoDB elige los elementos, sin leer el array en Python.
+
+    Input
+    - slug: slug de la plataforma
+    - roles: si se entrega, solo elimina esos roles; si no, todos los roles no nulos
+
+    Output
+    - dict con matched y modified (a nivel documento: 0 o 1)
+    """
+    if roles:
+        array_filter = {"ds.role": {"$in": list(roles)}}
+    else:
+        # $ne: None deja fuera role: null, igual que el conteo en Python de quien llama
+        array_filter = {"ds.role": {"$ne": None}}
+
+    res = _platforms().update_one(
+        {"slug": slug},
+        {"$unset": {"dataSources.$[ds].role": ""}},
+        array_filters=[array_filter],
+    )
+    _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+def datasource_role_bulk_delete(items: List[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Elimina dataSources.role para muchos dataSources en una sola ida a la DB (bulk_write).
+
+    Input
+    - items: lista de tuplas (slug, datasource_url)
+
+    Output
+    - dict con matched y modified totales
+    """
+    return _datasource_field_bulk_unset("role", items)
 
 #KIND
 def datasource_kind(slug: str, datasource_url: str, action: str = "get", kind: str | None = None):
@@ -671,49 +817,31 @@ def datasource_kind(slug: str, datasource_url: str, action: str = "get", kind: s
     - action "get": str o None
     - action "set" o "update" o "delete": dict con matched y modified
     """
-    """
-    Query base
-    Encuentra el documento por slug y el elemento de dataSources por url.
-    """
-    query = {"slug": slug, "dataSources.url": datasource_url}
+    return _datasource_field("kind", slug, datasource_url, action, kind)
 
-    action_norm = (action or "").strip().lower()
-
-    if action_norm == "get":
-        """
-        Lee solo el elemento de dataSources que matchea usando projection posicional.
-        """
-        doc = platforms.find_one(query, {"_id": 0, "dataSources.$": 1})
-        if not doc:
-            return None
+def datasource_kind_bulk(items: List[Tuple[str, str, str]]) -> Dict[str, int]:
+    """
+    Setea dataSources.kind para muchos dataSources en una sola ida a la DB (bulk_write).
 
-        ds_list = doc.get("dataSources") or []
-        if not ds_list or not isinstance(ds_list[0], dict):
-            return None
+    Input
+    - items: lista de tuplas (slug, datasource_url, kind)
 
-        return ds_list[0].get("kind")
+    Output
+    - dict con matched y modified totales
+    """
+    return _datasource_field_bulk("kind", items)
 
-    if action_norm in {"set", "update"}:
-        """
-        Valida kind
-        Setea dataSources.$.kind en el elemento encontrado.
-        """
-        if not isinstance(kind, str) or not kind.strip():
-            raise ValueError("kind debe ser un string no vacio para action set o update")
-
-        update = {"$set": {"dataSources.$.kind": kind.strip()}}
-        res = platforms.update_one(query, update)
-        return {"matched": res.matched_count, "modified": res.modified_count}
+def datasource_kind_bulk_delete(items: List[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Elimina dataSources.kind para muchos dataSources en una sola ida a la DB (bulk_write).
 
-    if action_norm in {"delete", "unset", "remove"}:
-        """
-        Elimina el campo kind del elemento encontrado.
-        """
-        update = {"$unset": {"dataSources.$.kind": ""}}
-        res = platforms.update_one(query, update)
-        return {"matched": res.matched_count, "modified": res.modified_count}
+    Input
+    - items: lista de tuplas (slug, datasource_url)
 
-    raise ValueError("action no valido. Usa get, set, update, delete")
+    Output
+    - dict con matched y modified totales
+    """
+    return _datasource_field_bulk_unset("kind", items)
 
 
 #############
@@ -727,33 +855,27 @@ def upsert_mobile_app(slug: str, url: str, store: str) -> Dict[str, int]:
     - Si no existe, agrega el objeto {url, store}.
     - Si el array mobileApps no existe, lo crea.
     """
-    # 1. Intentar actualizar si existe
-    query = {"slug": slug, "mobileApps.url": url}
-    update = {"$set": {"mobileApps.$.store": store}}
-    
-    result = platforms.update_one(query, update)
-    
-    if result.matched_count > 0:
-        return {"matched": result.matched_count, "modified": result.modified_count}
-        
-    # 2. Si no existe (matched_count == 0), hacemos push
-    # Usamos addToSet para evitar duplicados si corre en paralelo, aunque la logica de arriba ya cubre update.
-    # Pero para ser consistentes con "agregar si no existe", push es lo estandar tras fallo de update por url.
-    
-    query_push = {"slug": slug}
-    update_push = {"$push": {"mobileApps": {"url": url, "store": store}}}
-    
-    result_push = platforms.update_one(query_push, update_push)
-    
-    return {"matched": result_push.matched_count, "modified": result_push.modified_count}
+    return _upsert_array_item(slug, "mobileApps", url, "store", store)
+
+def upsert_mobile_apps_bulk(slug: str, apps: List[Dict[str, str]]) -> Dict[str, int]:
+    """
+    Igual que upsert_mobile_app para varias apps del mismo slug en una sola ida a la DB.
+
+    Input
+    - apps: lista de {"url": ..., "store": ...}
+    """
+    return _upsert_array_items_bulk(slug, "mobileApps", apps, "store")
 
 def get_mobile_apps(slug: str, store: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Retorna la lista de mobileApps para un slug.
-    Opcionalmente filtra por store.
+    Opcionalmente filtra por store (el filtro corre en MongoDB).
     """
-    project = {"_id": 0, "mobileApps": 1}
-    doc = platforms.find_one({"slug": slug}, project)
+    if store:
+        return _filter_array_items(slug, "mobileApps", "store", store)
+
+    project = _PROJ_MOBILE_APPS
+    doc = _platforms().find_one({"slug": slug}, project)
     
     if not doc or "mobileApps" not in doc:
         return []
@@ -762,9 +884,6 @@ def get_mobile_apps(slug: str, store: Optional[str] = None) -> List[Dict[str, An
     if not isinstance(apps, list):
         return []
         
-    if store:
-        return [app for app in apps if isinstance(app, dict) and app.get("store") == store]
-        
     return apps
 
 def remove_mobile_app(slug: str, url: Optional[str] = None, store: Optional[str] = None) -> Dict[str, int]:
@@ -790,7 +909,8 @@ def remove_mobile_app(slug: str, url: Optional[str] = None, store: Optional[str]
             
         update = {"$pull": {"mobileApps": pull_filter}}
         
-    result = platforms.update_one(query, update)
+    result = _platforms().update_one(query, update)
+    _invalidate_platform_cache(slug)
     return {"matched": result.matched_count, "modified": result.modified_count}
 
 def delete_mobile_apps_field(slug: str) -> Dict[str, int]:
@@ -798,9 +918,10 @@ def delete_mobile_apps_field(slug: str) -> Dict[str, int]:
     Elimina completamente el campo mobileApps del documento.
     """
     query = {"slug": slug}
-    update = {"$unset": {"mobileApps": ""}}
+    update = _UNSET_MOBILE_APPS
     
-    result = platforms.update_one(query, update)
+    result = _platforms().update_one(query, update)
+    _invalidate_platform_cache(slug)
     return {"matched": result.matched_count, "modified": result.modified_count}
 
 
@@ -815,30 +936,27 @@ def upsert_social_profile(slug: str, url: str, platform: str) -> Dict[str, int]:
     - Si no existe, agrega el objeto {url, platform}.
     - Si el array socialProfiles no existe, lo crea.
     """
-    # 1. Intentar actualizar si existe
-    query = {"slug": slug, "socialProfiles.url": url}
-    update = {"$set": {"socialProfiles.$.platform": platform}}
-    
-    result = platforms.update_one(query, update)
-    
-    if result.matched_count > 0:
-        return {"matched": result.matched_count, "modified": result.modified_count}
-        
-    # 2. Si no existe (matched_count == 0), hacemos push
-    query_push = {"slug": slug}
-    update_push = {"$push": {"socialProfiles": {"url": url, "platform": platform}}}
-    
-    result_push = platforms.update_one(query_push, update_push)
-    
-    return {"matched": result_push.matched_count, "modified": result_push.modified_count}
+    return _upsert_array_item(slug, "socialProfiles", url, "platform", platform)
+
+def upsert_social_profiles_bulk(slug: str, profiles: List[Dict[str, str]]) -> Dict[str, int]:
+    """
+    Igual que upsert_social_profile para varios perfiles del mismo slug en una sola ida a la DB.
+
+    Input
+    - profiles: lista de {"url": ..., "platform": ...}
+    """
+    return _upsert_array_items_bulk(slug, "socialProfiles", profiles, "platform")
 
 def get_social_profiles(slug: str, platform: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Retorna la lista de socialProfiles para un slug.
-    Opcionalmente filtra por platform.
+    Opcionalmente filtra por platform (el filtro corre en MongoDB).
     """
-    project = {"_id": 0, "socialProfiles": 1}
-    doc = platforms.find_one({"slug": slug}, project)
+    if platform:
+        return _filter_array_items(slug, "socialProfiles", "platform", platform)
+
+    project = _PROJ_SOCIAL_PROFILES
+    doc = _platforms().find_one({"slug": slug}, project)
     
     if not doc or "socialProfiles" not in doc:
         return []
@@ -847,9 +965,6 @@ def get_social_profiles(slug: str, platform: Optional[str] = None) -> List[Dict[
     if not isinstance(profiles, list):
         return []
         
-    if platform:
-        return [p for p in profiles if isinstance(p, dict) and p.get("platform") == platform]
-        
     return profiles
 
 def remove_social_profile(slug: str, url: Optional[str] = None, platform: Optional[str] = None) -> Dict[str, int]:
@@ -875,7 +990,8 @@ def remove_social_profile(slug: str, url: Optional[str] = None, platform: Option
             
         update = {"$pull": {"socialProfiles": pull_filter}}
         
-    result = platforms.update_one(query, update)
+    result = _platforms().update_one(query, update)
+    _invalidate_platform_cache(slug)
     return {"matched": result.matched_count, "modified": result.modified_count}
 
 def delete_social_profiles_field(slug: str) -> Dict[str, int]:
@@ -883,9 +999,10 @@ def delete_social_profiles_field(slug: str) -> Dict[str, int]:
     Elimina completamente el campo socialProfiles del documento.
     """
     query = {"slug": slug}
-    update = {"$unset": {"socialProfiles": ""}}
+    update = _UNSET_SOCIAL_PROFILES
     
-    result = platforms.update_one(query, update)
+    result = _platforms().update_one(query, update)
+    _invalidate_platform_cache(slug)
     return {"matched": result.matched_count, "modified": result.modified_count}
 
 
@@ -905,7 +1022,7 @@ def upsert_page_routes(slug: str, projects_route: Optional[List[str]] = None, pr
     # Pero para eficiencia podemos intentar update directo.
     # Siguiendo estilo manage_operational_status:
     
-    doc = platforms.find_one(query, {"_id": 1})
+    doc = _platforms().find_one(query, _PROJ_SLUG)
     if not doc:
         return {"matched": 0, "modified": 0, "message": "Platform not found"}
     
@@ -928,14 +1045,15 @@ def upsert_page_routes(slug: str, projects_route: Optional[List[str]] = None, pr
     now_str = datetime.now(timezone.utc).isoformat()
     update_fields["pageRoutes.updatedAt"] = now_str
     
-    res = platforms.update_one(query, {"$set": update_fields})
+    res = _platforms().update_one(query, {"$set": update_fields})
+    _invalidate_platform_cache(slug)
     return {"matched": res.matched_count, "modified": res.modified_count, "updatedAt": now_str}
 
 def get_page_routes(slug: str) -> Optional[Dict[str, Any]]:
     """
     Retorna el objeto pageRoutes completo para un slug.
     """
-    doc = platforms.find_one({"slug": slug}, {"_id": 0, "pageRoutes": 1})
+    doc = _platforms().find_one({"slug": slug}, _PROJ_PAGE_ROUTES)
     if not doc:
         return None
     return doc.get("pageRoutes")
@@ -945,8 +1063,9 @@ def delete_page_routes(slug: str) -> Dict[str, int]:
     Elimina (unset) el campo pageRoutes completamente.
     """
     query = {"slug": slug}
-    update = {"$unset": {"pageRoutes": ""}}
-    res = platforms.update_one(query, update)
+    update = _UNSET_PAGE_ROUTES
+    res = _platforms().update_one(query, update)
+    _invalidate_platform_cache(slug)
     return {"matched": res.matched_count, "modified": res.modified_count}
 
 
@@ -954,11 +1073,32 @@ def delete_page_routes(slug: str) -> Dict[str, int]:
 #INTERNAL UTILITIES#
 ####################
 
+def _invalidate_platform_cache(slug: str) -> None:
+    """
+    Elimina del cache de get_platform_by_slug todas las entradas del slug (cualquier projection).
+    Se llama despues de cada escritura sobre la plataforma.
+    """
+    with _platform_cache_lock:
+        for key in [k for k in _platform_cache.keys() if k[0] == slug]:
+            _platform_cache.pop(key, None)
+
+def _invalidate_unique_values_cache(field: str) -> None:
+    """
+    Elimina del cache de _unique_string_values las entradas del campo (ambos include_empty).
+    """
+    with _platform_cache_lock:
+        _unique_values_cache.pop((field, True), None)
+        _unique_values_cache.pop((field, False), None)
+
+@lru_cache(maxsize=65536)
 def _to_host(value: str) -> str:
     """
     Convierte un string a host normalizado.
     Normaliza mayusculas, elimina scheme faltante, quita puerto y remueve www.
     Retorna string vacio si no puede parsear.
+
+    Usa una sola regex precompilada (_HOST_RE) en vez de urlparse: solo se necesita el host
+    (entre "://" y el siguiente "/", "?" o "#") y es mucho mas barato.
     """
     if not isinstance(value, str):
         return ""
@@ -967,26 +1107,12 @@ def _to_host(value: str) -> str:
     if not s:
         return ""
 
-    if "://" not in s:
-        s = "https://" + s
-
-    try:
-        p = urlparse(s)
-    except Exception:
+    m = _HOST_RE.match(s)
+    if m.group(1) is None and "://" in s:
+        # "://" aparece en la ruta o query, no es un scheme valido
         return ""
 
-    host = (p.netloc or "").lower()
-
-    if "@" in host:
-        host = host.split("@", 1)[1]
-
-    if ":" in host:
-        host = host.split(":", 1)[0]
-
-    if host.startswith("www."):
-        host = host[4:]
-
-    return host.strip(".")
+    return m.group(2).strip(".")
 
 def _belongs_to_platform(url: str, primary_domain: str, mode: str = "loose") -> bool:
     """
@@ -1001,13 +1127,19 @@ def _belongs_to_platform(url: str, primary_domain: str, mode: str = "loose") ->
       - acepta casos donde el label base aparece como label completo
         ejemplo.com -> ejemplo.algo.com
     """
+    return _belongs_to_platform_host(url, _to_host(primary_domain), mode=mode)
+
+def _belongs_to_platform_host(url: str, pd: str, mode: str = "loose") -> bool:
+    """
+    Igual que _belongs_to_platform pero recibe el host del primary_domain ya normalizado.
+    Permite calcular _to_host(primary_domain) una sola vez fuera de un loop.
+    """
     h = _to_host(url)
-    pd = _to_host(primary_domain)
 
     if not h or not pd:
         return False
 
-    if h == pd or h.endswith("." + pd):
+    if host_matches(h, pd):
         return True
 
     if mode == "strict":
@@ -1020,6 +1152,384 @@ def _belongs_to_platform(url: str, primary_domain: str, mode: str = "loose") ->
     labels = [part for part in h.split(".") if part]
     return base_label in labels
 
+def _collect_datasource_sections(slug: str, datasource_url: str, field: str, sections_norm) -> list:
+    """
+    Concatena en MongoDB las secciones pedidas de dataSources.<field> (links o texts)
+    para el dataSource con esa url. Solo viajan por la red las secciones solicitadas.
+
+    Pipeline
+    1) match: documento por slug que contiene el dataSource
+    2) limit: un solo documento
+    3) project: toma el dataSource con la url pedida con $filter (sin $unwind de todo el array)
+    4) project: concatena las secciones pedidas (las que no son array cuentan como vacias)
+    5) project: deja solo strings, con trim y no vacios
+
+    Output
+    - lista de strings ya limpios (puede tener repetidos)
+    """
+    section_arrays = []
+    for section in sections_norm:
+        path = f"$ds.{field}.{section}"
+        section_arrays.append({"$cond": [{"$isArray": path}, path, []]})
+
+    pipeline = [
+        {"$match": {"slug": slug, "dataSources.url": datasource_url}},
+        {"$limit": 1},
+        {"$project": {
+            "_id": 0,
+            "ds": {"$arrayElemAt": [
+                {"$filter": {
+                    "input": "$dataSources",
+                    "as": "d",
+                    "cond": {"$eq": ["$$d.url", datasource_url]},
+                }},
+                0,
+            ]},
+        }},
+        {"$project": {"items": {"$concatArrays": section_arrays}}},
+        {"$project": {"items": {"$filter": {
+            "input": {"$map": {
+                "input": {"$filter": {"input": "$items", "as": "i", "cond": {"$eq": [{"$type": "$$i"}, "string"]}}},
+                "as": "i",
+                "in": {"$trim": {"input": "$$i"}},
+            }},
+            "as": "i",
+            "cond": {"$ne": ["$$i", ""]},
+        }}}},
+    ]
+
+    doc = next(_platforms().aggregate(pipeline), None)
+    if not doc:
+        return []
+    return doc.get("items") or []
+
+def _datasource_field_bulk_ops(field: str, items: List[Tuple[str, str, str]]) -> List[UpdateOne]:
+    """
+    Construye un UpdateOne por item.
+    Valida cada valor igual que la accion set de datasource_role / datasource_kind.
+    """
+    ops = []
+    for slug, datasource_url, value in items:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{field} debe ser un string no vacio")
+        ops.append(UpdateOne(
+            {"slug": slug, "dataSources.url": datasource_url},
+            {"$set": {f"dataSources.$.{field}": value.strip()}}
+        ))
+    return ops
+
+def _datasource_field_bulk(field: str, items: List[Tuple[str, str, str]]) -> Dict[str, int]:
+    """
+    Envia los UpdateOne de _datasource_field_bulk_ops juntos con bulk_write(ordered=False).
+    """
+    ops = _datasource_field_bulk_ops(field, items)
+    if not ops:
+        return {"matched": 0, "modified": 0}
+
+    res = _platforms().bulk_write(ops, ordered=False)
+    for slug in {item[0] for item in items}:
+        _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+async def _adatasource_field_bulk(field: str, items: List[Tuple[str, str, str]]) -> Dict[str, int]:
+    """
+    Version async (Motor) de _datasource_field_bulk.
+    """
+    ops = _datasource_field_bulk_ops(field, items)
+    if not ops:
+        return {"matched": 0, "modified": 0}
+
+    res = await get_async_db()["platforms"].bulk_write(ops, ordered=False)
+    for slug in {item[0] for item in items}:
+        _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+def _datasource_field_bulk_unset(field: str, items: List[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Igual que _datasource_field_bulk pero elimina dataSources.$.<field> (accion delete).
+    """
+    update = _UNSET_DATASOURCE_FIELD.get(field) or {"$unset": {f"dataSources.$.{field}": ""}}
+    ops = [
+        UpdateOne({"slug": slug, "dataSources.url": datasource_url}, update)
+        for slug, datasource_url in items
+    ]
+
+    if not ops:
+        return {"matched": 0, "modified": 0}
+
+    res = _platforms().bulk_write(ops, ordered=False)
+    for slug in {item[0] for item in items}:
+        _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+def _filter_array_items(slug: str, array_field: str, key: str, value: str) -> List[Dict[str, Any]]:
+    """
+    Retorna los elementos de <array_field> con <key> == value usando $filter en MongoDB.
+    Solo viajan por la red los elementos que calzan.
+    Retorna [] si no existe la plataforma o el campo no es un array.
+    """
+    arr = f"${array_field}"
+    pipeline = [
+        {"$match": {"slug": slug}},
+        {"$limit": 1},
+        {"$project": {"_id": 0, "items": {"$cond": [
+            {"$isArray": arr},
+            {"$filter": {"input": arr, "as": "a", "cond": {"$eq": [f"$$a.{key}", {"$literal": value}]}}},
+            [],
+        ]}}},
+    ]
+
+    doc = next(_platforms().aggregate(pipeline), None)
+    if not doc:
+        return []
+    return doc["items"]
+
+def _repeated_values_pipeline(field: str, include_empty: bool) -> list:
+    """
+    Pipeline de get_repeated_slugs / get_repeated_primary_domains.
+    Se arma una vez por (campo, include_empty) al importar el modulo (_REPEATED_PIPELINES).
+
+    Pipeline
+    1) match: campo existente (include_empty True) o string con algun caracter no blanco (False)
+    2) group: agrupa por valor y cuenta
+    3) match: deja solo count mayor a 1
+    4) sort: count desc y luego valor asc
+    5) project: {<field>: valor, count} (con trim si include_empty es False)
+    """
+    if include_empty:
+        match_stage = {field: {"$exists": True}}
+        value = "$_id"
+    else:
+        match_stage = {field: {"$type": "string", "$regex": NON_BLANK_REGEX}}
+        value = {"$trim": {"input": "$_id"}}
+
+    return [
+        {"$match": match_stage},
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, field: value, "count": 1}},
+    ]
+
+_REPEATED_PIPELINES = {
+    (field, include_empty): _repeated_values_pipeline(field, include_empty)
+    for field in ("slug", "primaryDomain")
+    for include_empty in (True, False)
+}
+
+def _valid_datasource_urls_expr() -> dict:
+    """
+    Expresion de aggregation con las dataSources.url validas (no None, no vacio) del documento.
+    """
+    return {"$filter": {
+        "input": {"$ifNull": ["$dataSources.url", []]},
+        "as": "u",
+        "cond": {"$and": [{"$ne": ["$$u", None]}, {"$ne": ["$$u", ""]}]},
+    }}
+
+def _upsert_array_item(slug: str, array_field: str, url: str, value_field: str, value: str) -> Dict[str, int]:
+    """
+    Actualiza o agrega {url, <value_field>} en el array <array_field> con un solo update (pipeline).
+    - Si la url ya existe en el array, cambia <value_field> de ese elemento.
+    - Si no existe (o el array no existe), agrega el objeto al final.
+    Es atomico: no hay ventana entre "actualizar" y "push" como con dos update_one.
+    Usado por upsert_mobile_app y upsert_social_profile.
+    """
+    pipeline = _upsert_array_item_pipeline(array_field, url, value_field, value)
+
+    res = _platforms().update_one({"slug": slug}, pipeline)
+    _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+def _upsert_array_items_bulk(slug: str, array_field: str, items: List[Dict[str, str]], value_field: str) -> Dict[str, int]:
+    """
+    Igual que _upsert_array_item para varios items {url, <value_field>} del mismo slug,
+    enviados en un solo bulk_write.
+    ordered=True: todos tocan el mismo documento y el ultimo item de una url repetida debe ganar.
+    """
+    ops = []
+    for item in items:
+        url = item.get("url")
+        value = item.get(value_field)
+        if not isinstance(url, str) or not url.strip():
+            raise ValueError("url debe ser un string no vacio")
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{value_field} debe ser un string no vacio")
+        ops.append(UpdateOne({"slug": slug}, _upsert_array_item_pipeline(array_field, url, value_field, value)))
+
+    if not ops:
+        return {"matched": 0, "modified": 0}
+
+    res = _platforms().bulk_write(ops, ordered=True)
+    _invalidate_platform_cache(slug)
+    return {"matched": res.matched_count, "modified": res.modified_count}
+
+def _upsert_array_item_pipeline(array_field: str, url: str, value_field: str, value: str) -> list:
+    """
+    Pipeline de update usado por _upsert_array_item y _upsert_array_items_bulk.
+    """
+    arr = f"${array_field}"
+    url_lit = {"$literal": url}
+    new_item = {"url": url_lit, value_field: {"$literal": value}}
+
+    pipeline = [{"$set": {array_field: {"$cond": [
+        {"$in": [url_lit, {"$ifNull": [f"{arr}.url", []]}]},
+        {"$map": {
+            "input": arr,
+            "as": "it",
+            "in": {"$cond": [
+                {"$eq": ["$$it.url", url_lit]},
+                {"$mergeObjects": ["$$it", {value_field: {"$literal": value}}]},
+                "$$it",
+            ]},
+        }},
+        {"$concatArrays": [{"$ifNull": [arr, []]}, [new_item]]},
+    ]}}}]
+    return pipeline
+
+def _datasource_field(field: str, slug: str, datasource_url: str, action: str, value: Optional[str]):
+    """
+    Implementacion comun de datasource_role y datasource_kind sobre dataSources.<field>.
+
+    - "get": lee el campo (filtrado en MongoDB)
+    - "set" / "update": valida value y setea dataSources.$.<field>
+    - "delete" / "unset" / "remove": elimina dataSources.$.<field>
+    """
+    query = {"slug": slug, "dataSources.url": datasource_url}
+
+    action_norm = (action or "").strip().lower()
+
+    if action_norm == "get":
+        return _get_datasource_field(slug, datasource_url, field)
+
+    if action_norm in {"set", "update"}:
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"{field} debe ser un string no vacio para action set o update")
+
+        update = {"$set": {f"dataSources.$.{field}": value.strip()}}
+        res = _platforms().update_one(query, update)
+        _invalidate_platform_cache(slug)
+        return {"matched": res.matched_count, "modified": res.modified_count}
+
+    if action_norm in {"delete", "unset", "remove"}:
+        update = _UNSET_DATASOURCE_FIELD.get(field) or {"$unset": {f"dataSources.$.{field}": ""}}
+        res = _platforms().update_one(query, update)
+        _invalidate_platform_cache(slug)
+        return {"matched": res.matched_count, "modified": res.modified_count}
+
+    raise ValueError("action no valido. Usa get, set, update, delete")
+
+def _get_datasource_field(slug: str, datasource_url: str, field: str):
+    """
+    Retorna el valor escalar dataSources.<field> del dataSource con esa url.
+    El $filter corre en MongoDB, asi solo viaja el valor pedido y no el elemento completo
+    (que puede traer todos sus links y texts).
+
+    Retorna None si no existe la plataforma, el dataSource o el campo.
+    """
+    pipeline = [
+        {"$match": {"slug": slug, "dataSources.url": datasource_url}},
+        {"$project": {
+            "_id": 0,
+            "value": {"$arrayElemAt": [
+                {"$map": {
+                    "input": {"$filter": {
+                        "input": "$dataSources",
+                        "as": "d",
+                        "cond": {"$eq": ["$$d.url", datasource_url]},
+                    }},
+                    "as": "d",
+                    "in": f"$$d.{field}",
+                }},
+                0,
+            ]},
+        }},
+        {"$limit": 1},
+    ]
+
+    doc = next(_platforms().aggregate(pipeline), None)
+    if not doc:
+        return None
+    return doc.get("value")
+
+def _iter_string_values(field: str, include_empty: bool = False, batch_size: int = CURSOR_BATCH_SIZE, match: Optional[Dict[str, Any]] = None, hint: Optional[List[Tuple[str, int]]] = None) -> Iterator[str]:
+    """
+    Entrega los valores string de un campo de platforms (con repeticion) filtrados en MongoDB.
+
+    Pipeline
+    1) match: solo valores de tipo string (y con algun caracter no blanco si include_empty es False)
+       + filtro extra opcional (match). Se evalua sobre el indice del campo.
+    2) project: el valor (con trim si include_empty es False)
+    3) match: descarta strings vacios (solo si include_empty es False)
+
+    hint: indice a usar (opcional), para que el planner no elija otro que no cubra el filtro extra
+    """
+    stage = {field: {"$type": "string"}}
+    if not include_empty:
+        stage[field]["$regex"] = NON_BLANK_REGEX
+    if match:
+        stage.update(match)
+
+    value = f"${field}" if include_empty else {"$trim": {"input": f"${field}"}}
+    pipeline = [
+        {"$match": stage},
+        {"$project": {"_id": 0, "v": value}},
+    ]
+    if not include_empty:
+        pipeline.append({"$match": {"v": {"$ne": ""}}})
+
+    kwargs = {}
+    if hint is None and not match:
+        hint = _hint([(field, 1)])
+    if hint:
+        kwargs["hint"] = hint
+    # prefetch: la pagina siguiente se pide mientras el caller procesa la actual
+    for d in run_agg(_platforms_analytics(), pipeline, batch=batch_size, **kwargs):
+        yield d["v"]
+
+def _unique_string_values(field: str, include_empty: bool = False) -> List[str]:
+    """
+    Retorna los valores unicos de un campo string de platforms en una sola pasada por la DB.
+
+    Pipeline
+    1) match: solo valores de tipo string (reemplaza el isinstance en Python)
+       y con algun caracter no blanco (solo si include_empty es False)
+    2) project: trim del valor (solo si include_empty es False)
+    3) match: descarta strings vacios (solo si include_empty es False)
+    4) group: deduplica por valor
+
+    El resultado queda en cache UNIQUE_VALUES_CACHE_TTL segundos (ver PLATFORM_CACHE_ENABLED).
+    Se retorna una copia de la lista, asi el caller puede modificarla.
+    """
+    key = (field, include_empty)
+    if PLATFORM_CACHE_ENABLED:
+        with _platform_cache_lock:
+            cached = _unique_values_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+    stage = {field: {"$type": "string"}}
+    if not include_empty:
+        stage[field]["$regex"] = NON_BLANK_REGEX
+    pipeline = [{"$match": stage}]
+    if include_empty:
+        pipeline.append({"$group": {"_id": f"${field}"}})
+    else:
+        pipeline.extend([
+            {"$project": {"_id": 0, "v": {"$trim": {"input": f"${field}"}}}},
+            {"$match": {"v": {"$ne": ""}}},
+            {"$group": {"_id": "$v"}},
+        ])
+
+    # run_agg usa allowDiskUse: el $group puede pasar el limite de memoria de 100 MB en colecciones grandes
+    # hint: fuerza el IXSCAN sobre el indice del campo
+    values = [d["_id"] for d in run_agg(_platforms_analytics(), pipeline, prefetch=False, **_hint_kwargs(field))]
+
+    if PLATFORM_CACHE_ENABLED:
+        with _platform_cache_lock:
+            _unique_values_cache[key] = values
+    return list(values)
+
 def _normalize_sections(sections):
     """
     Normaliza el input sections para aceptar:
@@ -1027,43 +1537,32 @@ def _normalize_sections(sections):
     - str: un solo campo
     - list tuple set: combinatoria de campos
 
-    Retorna lista de secciones validas.
+    Retorna tupla de secciones validas, sin repetidas (una seccion repetida
+    duplicaria el trabajo en MongoDB y los textos cuando dedupe=False).
     """
-    ALLOWED_SECTIONS = {"head", "header", "main", "footer"}
-
     if sections is None:
-        return ["head", "header", "main", "footer"]
+        return _DEFAULT_SECTIONS
 
     if isinstance(sections, str):
-        sections_list = [sections]
-    else:
-        sections_list = list(sections)
-
-    out = []
-    for s in sections_list:
-        if not isinstance(s, str):
-            continue
-        s2 = s.strip().lower()
-        if s2 in ALLOWED_SECTIONS:
-            out.append(s2)
+        s2 = sections.strip().lower()
+        return (s2,) if s2 in ALLOWED_SECTIONS else ()
 
-    return out
+    allowed = ALLOWED_SECTIONS
+    return tuple(dict.fromkeys(
+        s2 for s2 in (s.strip().lower() for s in sections if isinstance(s, str)) if s2 in allowed
+    ))
 
 def _unique_preserve_order(values):
     """
     Deduplica preservando el orden de aparicion.
-    Solo conserva strings no vacios.
+    Solo conserva strings no vacios (con trim).
+    dict.fromkeys deduplica en C manteniendo el orden de insercion.
     """
-    seen = set()
-    out = []
-    for v in values:
-        if not isinstance(v, str):
-            continue
-        v2 = v.strip()
-        if not v2:
-            continue
-        if v2 in seen:
-            continue
-        seen.add(v2)
-        out.append(v2)
-    return out
+    return list(dict.fromkeys(v for v in (x.strip() for x in values if isinstance(x, str)) if v))
+
+def _unique_preserve_order_fast(values):
+    """
+    Igual que _unique_preserve_order pero asume strings ya limpios (trim hecho en MongoDB).
+    Se evitan el isinstance y el strip por item: filter(None, ...) y dict.fromkeys corren en C.
+    """
+    return list(dict.fromkeys(filter(None, values)))
@@ -102,6 +102,13 @@ platforms.find_one({"slug": "reity"}, {"_id": 0, "slug": 1, "name": 1})
 platforms.find({"active": True})
 platforms.find({"active": True}, {"slug": 1, "name": 1})
 
+# batch_size(n)
+# - documentos por ida a la DB (default: 101 el primero, luego hasta 16 MiB)
+# - para recorrer muchos documentos usar 500-2000: menos getMore y memoria predecible
+# - helper: src.DB.bulk.iter_docs(coll, filter, projection, batch=500)
+# - a futuro, con pipelines en streaming, evaluar prefetch de batches (DocsNeededBounds)
+platforms.find({"active": True}, {"slug": 1}).batch_size(500)
+
 # sort(field, direction)
 # - field: nombre del campo por el que ordenas
 # - direction: 1 ascendente, -1 descendente
@@ -220,6 +227,23 @@ platforms.aggregate(
     ]
 )
 
+# Para aggregations con muchos resultados (reportes):
+# - batchSize: documentos por ida a la DB
+# - allowDiskUse: deja que $group/$sort grandes usen disco en vez de fallar por memoria
+# - $project al final: mandar solo los campos que se usan
+# - helper: src.DB.bulk.run_agg(coll, pipeline, batch=1000, project={...}) hace todo eso
+#   y ademas lee el siguiente batch en un thread mientras se procesa el actual
+platforms.aggregate(
+    [
+        {"$match": {"active": True}},
+        {"$group": {"_id": "$country", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$project": {"_id": 1, "count": 1}},
+    ],
+    batchSize=1000,
+    allowDiskUse=True,
+)
+
 
 # -----------------------------
 # BULK WRITE
@@ -0,0 +1,141 @@
+# DB/write_queue.py
+# Cola acotada entre quien produce escrituras (scrapers, clasificadores) y MongoDB
+# 1) Los productores hacen put(op): si la cola esta llena, put espera (backpressure)
+# 2) Un pool chico de threads vacia la cola con bulk_write(ordered=False)
+#    cada batch_size operaciones o cada flush_ms, lo que ocurra primero
+# 3) close() espera a que se escriba todo lo encolado
+# Agrupar del lado de la DB (y no una ida por update_one) mantiene la latencia estable
+# y la memoria acotada aunque el productor se acelere
+#
+# Ejemplo:
+# with WriteQueue(platforms) as wq:
+#     for slug, apps in resultados:
+#         wq.put(UpdateOne({"slug": slug}, {"$set": {"mobileApps": apps}}))
+# print(wq.totals)
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+from src.DB.mongo import close_client, load_mongo_config
+
+logger = logging.getLogger(__name__)
+
+# Marca de fin: un _STOP por worker al cerrar
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        collection: Collection,
+        maxsize: int = 10_000,
+        batch_size: Optional[int] = None,
+        flush_ms: int = 250,
+        workers: int = 2,
+    ) -> None:
+        # - collection: coleccion destino de todas las ops
+        # - maxsize: ops maximas en espera antes de que put bloquee
+        # - batch_size: ops por bulk_write (default MONGO_BULK_BATCH)
+        # - flush_ms: tiempo maximo que una op espera a que se complete su batch
+        # - workers: threads escribiendo en paralelo
+        self._collection = collection
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._batch_size = batch_size or load_mongo_config().bulk_batch_size
+        self._flush_s = flush_ms / 1000
+        self._lock = threading.Lock()
+        self._closed = False
+        self.totals = {"matched": 0, "modified": 0, "upserted": 0, "inserted": 0, "failed": 0}
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"mongo-write-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def put(self, op: Any) -> None:
+        # Encola una op (UpdateOne, InsertOne, ...). Bloquea si la cola esta llena
+        if self._closed:
+            raise ValueError("WriteQueue is closed")
+        self._queue.put(op, block=True)
+
+    def close(self, close_mongo_client: bool = False) -> Dict[str, int]:
+        # Escribe lo pendiente, detiene los workers y retorna los totales
+        # close_mongo_client=True cierra tambien el MongoClient compartido (fin del script)
+        if not self._closed:
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+            for t in self._threads:
+                t.join()
+        if close_mongo_client:
+            close_client()
+        return self.totals
+
+    def __enter__(self) -> "WriteQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _worker(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_s
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+
+    def _flush(self, batch: List[Any]) -> None:
+        try:
+            res = self._collection.bulk_write(batch, ordered=False)
+            counts = {
+                "matched": res.matched_count,
+                "modified": res.modified_count,
+                "upserted": res.upserted_count,
+                "inserted": res.inserted_count,
+                "failed": 0,
+            }
+        except BulkWriteError as e:
+            # ordered=False: las ops validas se aplicaron, solo fallaron las de writeErrors
+            d = e.details
+            counts = {
+                "matched": d.get("nMatched", 0),
+                "modified": d.get("nModified", 0),
+                "upserted": d.get("nUpserted", 0),
+                "inserted": d.get("nInserted", 0),
+                "failed": len(d.get("writeErrors", [])),
+            }
+            logger.error(f"bulk_write with {counts['failed']} failed ops of {len(batch)}")
+        except Exception as e:
+            # PyMongoError, pero tambien TypeError (item que no es una op) o InvalidDocument
+            # (valor no serializable): el batch se cuenta como fallido y el worker sigue vivo,
+            # si no los productores quedarian bloqueados en put() con la cola llena
+            counts = {"matched": 0, "modified": 0, "upserted": 0, "inserted": 0, "failed": len(batch)}
+            logger.error(f"bulk_write of {len(batch)} ops failed: {e!r}")
+
+        with self._lock:
+            for k, v in counts.items():
+                self.totals[k] += v
@@ -0,0 +1,101 @@
+# DB/writer.py
+# Escrituras en paralelo con procesos (ProcessPoolExecutor)
+# 1) Cada worker es un proceso con su propio MongoClient (get_client dentro del proceso)
+# 2) El proceso principal parte los documentos en batches y los reparte entre workers
+# 3) Cada worker escribe su batch con bulk_write(ordered=False)
+# Sirve cuando armar/serializar las escrituras es trabajo Python pesado (GIL) y hay varios cores
+#
+# Notas:
+# - Se usa el contexto "spawn": MongoClient no es fork-safe, cada worker arranca limpio
+#   Con spawn cada worker vuelve a importar el modulo principal: el script que llama a
+#   parallel_write / parallel_upsert debe hacerlo bajo if __name__ == "__main__":
+#   (si no, cada worker relanza el script completo)
+# - A lo mas 2 batches por worker quedan en vuelo: specs se consume a medida que se escribe,
+#   asi un generador grande no se serializa entero a la cola del pool
+# - Lo que se envia a los workers son dicts simples (picklables), no objetos de pymongo
+# - Entre batches no hay orden garantizado; si importa, incluir un timestamp en el $set
+#   y filtrar por el (ej: {"slug": s, "updatedAt": {"$lt": ts}}) para que gane el mas nuevo
+
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from src.DB.mongo import get_client, get_db, load_mongo_config
+from src.DB.bulk import _batches, bulk_write_batched
+
+# Maximo de procesos: mas alla de 4 el cuello pasa a ser el servidor, no el cliente
+MAX_WRITER_PROCESSES = 4
+
+
+def _default_workers() -> int:
+    return min(os.cpu_count() or 1, MAX_WRITER_PROCESSES)
+
+
+def _init_worker() -> None:
+    # Corre una vez por proceso: crea el MongoClient (y su pool) propio del worker
+    get_client()
+
+
+def _write_batch(collection_name: str, specs: List[Dict[str, Any]]) -> Dict[str, int]:
+    # Corre dentro del worker
+    # specs: [{"filter": {...}, "update": {...}, "upsert": bool}, ...]
+    ops = [
+        UpdateOne(spec["filter"], spec["update"], upsert=spec.get("upsert", False))
+        for spec in specs
+    ]
+    return bulk_write_batched(get_db()[collection_name], ops, batch=len(ops))
+
+
+def parallel_write(collection_name: str, specs: Iterable[Dict[str, Any]], batch: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    # Reparte specs de UpdateOne entre procesos y suma los resultados
+    # - collection_name: nombre de la coleccion (ej: "platforms")
+    # - specs: dicts {"filter", "update", "upsert"} ya listos para BSON
+    # - batch: specs por bulk_write (default MONGO_BULK_BATCH)
+    # - workers: procesos (default min(cpu_count, 4))
+    # Ejemplo:
+    # parallel_write("platforms", ({"filter": {"slug": s}, "update": {"$set": {...}}} for s in slugs))
+    size = batch or load_mongo_config().bulk_batch_size
+    workers = workers or _default_workers()
+    max_in_flight = 2 * workers
+    totals = {"matched": 0, "modified": 0, "upserted": 0, "inserted": 0}
+
+    def _collect(done) -> None:
+        for fut in done:
+            res = fut.result()
+            for k in totals:
+                totals[k] += res[k]
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        in_flight = set()
+        for chunk in _batches(specs, size):
+            # Espera a que termine algun batch antes de serializar el siguiente
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                _collect(done)
+            in_flight.add(pool.submit(_write_batch, collection_name, chunk))
+        _collect(wait(in_flight).done)
+
+    return totals
+
+
+def parallel_upsert(collection_name: str, docs: Iterable[Dict[str, Any]], key: str, batch: Optional[int] = None, workers: Optional[int] = None) -> Dict[str, int]:
+    # Version en paralelo de bulk_upsert: un upsert ($set del doc completo) por documento segun key
+    # El indice sobre key se crea una vez aqui, no en cada worker
+    try:
+        get_db()[collection_name].create_index(key)
+    except PyMongoError:
+        pass
+
+    specs = (
+        {"filter": {key: doc[key]}, "update": {"$set": doc}, "upsert": True}
+        for doc in docs
+    )
+    return parallel_write(collection_name, specs, batch, workers)
@@ -1,86 +1,185 @@
-from urllib.parse import urlparse
+import re
+from collections import namedtuple
+from functools import lru_cache
 from src.analizers import domain_lists
+from src.utils.domains import DomainTrie, host_matches
+
+# Regex de RFC 3986 (apendice B): [scheme:][//netloc][path][?query][#fragment]
+# grupo 1 = netloc, grupo 2 = path. Mismo corte que urlparse, sin armar un ParseResult.
+_URL_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.\-]*:)?(?://([^/?#]*))?([^?#]*)")
+# Igual que urlsplit: quitar controles C0/espacio al inicio y tab/CR/LF en cualquier parte
+_C0_OR_SPACE = "".join(map(chr, range(0x21)))
+_UNSAFE = str.maketrans("", "", "\t\r\n")
+
+
+@lru_cache(maxsize=8192)
+def _split(link):
+    # (netloc, path) de un link; cacheado porque cada link pasa por varios is_*
+    m = _URL_RE.match(link.lstrip(_C0_OR_SPACE).translate(_UNSAFE))
+    return (m.group(1) or "", m.group(2))
 
 
 def _netloc(link):
-    netloc = urlparse(link).netloc.lower()
+    netloc = _split(link)[0].lower()
+    if "@" in netloc:            # strip userinfo
+        netloc = netloc.rsplit("@", 1)[1]
     if ":" in netloc:            # strip port
         netloc = netloc.split(":")[0]
     return netloc
 
 
-def is_in_root_domain(link, root_domain):
-    netloc = _netloc(link)
+def _path(link):
+    return _split(link)[1]
+
+
+# Partes de un link que usan los predicados, calculadas una vez por link
+LinkFeatures = namedtuple("LinkFeatures", "host path")
+
+
+@lru_cache(maxsize=8192)
+def link_features(link):
+    # Un solo parseo por link: classify, is_in_root_domain e is_youtube_* reusan el resultado
+    return LinkFeatures(_netloc(link), _path(link))
+
+
+# Indice de dominios -> categorias, armado una vez al importar (ver DomainTrie en src/utils/domains).
+_CATEGORY_LISTS = (
+    ("social", domain_lists.SOCIAL_GENERIC_DOMAINS_SET),
+    ("multimedia", domain_lists.CDN_DOMAINS_SET),
+    ("app_store", domain_lists.STORE_DOMAINS_SET),
+    ("news", domain_lists.NEWS_DOMAINS_SET),
+    ("property", domain_lists.THIRD_PARTY_DOMAINS_SET),
+    ("legal", domain_lists.REGULATOR_DOMAINS_SET),
+    ("to_be_ignored", domain_lists.IGNORE_DOMAINS_SET),
+)
+
+
+def _build_trie():
+    trie = DomainTrie()
+    for category, domains in _CATEGORY_LISTS:
+        for d in domains:
+            trie.insert(d, category)
+    return trie
+
+
+_TRIE = _build_trie()
+
+# Host exactamente igual a un dominio de las listas (el caso mas comun): un solo hash lookup.
+# Guarda el resultado completo del trie (tambien los dominios padre, ej fca.org.uk para register.fca.org.uk)
+_EXACT = {_d: _TRIE.match(_d) for _, _domains in _CATEGORY_LISTS for _d in _domains}
+
+
+@lru_cache(maxsize=8192)
+def _host_categories(netloc):
+    # Todas las categorias cuyo dominio es sufijo del host
+    cats = _EXACT.get(netloc)
+    if cats is None:
+        cats = _TRIE.match(netloc)
+    return cats
+
+
+def _in_category(link, category):
+    return category in _host_categories(link_features(link).host)
+
+
+def classify(link):
+    """
+    Clasifica un link en una sola pasada (un parseo del link, un recorrido del trie).
+    Mismo orden de prioridad que usa model_processor:
+    app_store, social (incluye perfil de youtube), multimedia (incluye video de youtube),
+    news, property, legal, to_be_ignored. Retorna None si no calza con ninguna.
+    """
+    host, path = link_features(link)
+    category = _host_category(host)
+
+    # Caso comun: la categoria depende solo del host (un lookup cacheado)
+    if category == "app_store" or "youtube.com" not in host:
+        return category
+
+    # youtube: el path decide entre perfil (social) y video (multimedia)
+    if path.startswith("/@") or category == "social":
+        return "social"
+    if path.startswith("/watch"):
+        return "multimedia"
+    return category
+
+
+# Prioridad entre categorias cuando un host calza con varias
+_PRIORITY = ("app_store", "social", "multimedia", "news", "property", "legal", "to_be_ignored")
+
+
+@lru_cache(maxsize=8192)
+def _host_category(host):
+    # Categoria ganadora de un host, resuelta una vez por host distinto
+    cats = _host_categories(host)
+    for category in _PRIORITY:
+        if category in cats:
+            return category
+    return None
+
+
+def classify_batch(links, root_domain=None):
+    """
+    Clasifica muchos links de una vez. Retorna {link: categoria}.
+    - "root" si el link es del root_domain (si se entrega)
+    - la categoria de classify en otro caso, o None si no calza con ninguna
+    El root_domain se normaliza una sola vez y cada link se parsea una vez (link_features).
+    """
+    root_host = _normalize_root(root_domain) if root_domain else None
+    out = {}
+    for link in links:
+        if link in out:
+            continue
+        if root_host is not None and host_matches(link_features(link).host, root_host):
+            out[link] = "root"
+        else:
+            out[link] = classify(link)
+    return out
+
+
+def _normalize_root(root_domain):
     root_domain = root_domain.lower()
-    
     # Si root_domain viene con protocolo, extraer solo el host
     if "://" in root_domain:
         root_domain = _netloc(root_domain)
-        
-    return netloc == root_domain or netloc.endswith("." + root_domain)
+    return root_domain
+
+
+def is_in_root_domain(link, root_domain):
+    return host_matches(link_features(link).host, _normalize_root(root_domain))
 
 
 def is_social_media(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.SOCIAL_GENERIC_DOMAINS
-    )
+    return _in_category(link, "social")
 
 def is_youtube_profile(link):
-    netloc = _netloc(link)
-    path = urlparse(link).path
+    netloc, path = link_features(link)
     return "youtube.com" in netloc and path.startswith("/@")
 
 
 def is_multimedia(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.CDN_DOMAINS
-    )
+    return _in_category(link, "multimedia")
 
 def is_youtube_video(link):
-    netloc = _netloc(link)
-    path = urlparse(link).path
+    netloc, path = link_features(link)
     return "youtube.com" in netloc and path.startswith("/watch")
 
 
 def is_app_store(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.STORE_DOMAINS
-    )
+    return _in_category(link, "app_store")
 
 
 def is_news(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.NEWS_DOMAINS
-    )
+    return _in_category(link, "news")
 
 
 def is_property(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.THIRD_PARTY_DOMAINS
-    )
+    return _in_category(link, "property")
 
 
 def is_legal(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.REGULATOR_DOMAINS
-    )
+    return _in_category(link, "legal")
 
 
 def is_to_be_ignored(link):
-    netloc = _netloc(link)
-    return any(
-        netloc == d or netloc.endswith("." + d)
-        for d in domain_lists.IGNORE_DOMAINS
-    )
+    return _in_category(link, "to_be_ignored")
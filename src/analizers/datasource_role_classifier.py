@@ -3,19 +3,43 @@ Módulo para clasificar los roles de los dataSources de una compañía.
 Clasifica la URL principal de cada objeto en dataSources y asigna el role correspondiente.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from src.DB.platforms_querys import (
     get_platform_by_slug,
     get_datasource_by_url,
     get_unique_datasource_urls,
-    datasource_role
+    datasource_role,
+    datasource_role_bulk,
+    datasource_role_clear,
+    get_datasource_roles,
+    get_unroled_datasources,
+    aget_platform_by_slug,
+    aget_unroled_datasources,
+    adatasource_role_bulk
 )
-from src.analizers.role_classifier import classify_url, get_available_roles
+from src.analizers.role_classifier import classify_url, classify_batch, get_available_roles
+
+
+# Projection de la compañía cuando se clasifican todos sus dataSources
+_PROJ_CLASSIFY = {"_id": 0, "primaryDomain": 1, "dataSources.url": 1, "dataSources.role": 1}
+
+
+def _validate_target_roles(target_roles: Optional[List[str]]) -> Optional[tuple]:
+    """
+    Deja solo los roles existentes (get_available_roles es un frozenset cacheado).
+    Retorna None si no se pidio ninguno o ninguno es valido (usar todos).
+    """
+    if not target_roles:
+        return None
+    available_roles = get_available_roles()
+    valid = tuple(r for r in target_roles if r in available_roles)
+    return valid or None
 
 
 def classify_role_platform_datasources(
     slug: str,
-    target_roles: Optional[List[str]] = None
+    target_roles: Optional[List[str]] = None,
+    only_missing_role: bool = False
 ) -> Dict[str, Any]:
     """
     Clasifica los roles de todos los dataSources de una compañía.
@@ -25,23 +49,69 @@ def classify_role_platform_datasources(
       - slug: slug de la company
       - target_roles: Lista de roles a buscar. Si es None, busca todos los roles disponibles.
                       Si se especifica, solo clasifica esos roles específicos.
+      - only_missing_role: True clasifica solo los dataSources sin role. El filtro corre en
+                      MongoDB, asi los ya clasificados no se traen ni se procesan.
     
     Output:
       - Dict con estadísticas:
         {
-          "processed": <int>,  # Total de dataSources procesados
+          "processed": <int>,  # Total de dataSources procesados (con only_missing_role: solo los sin role)
           "classified": <int>, # DataSources que recibieron un role
           "not_classified": <int>, # DataSources sin role
           "roles_found": {<role>: <count>}, # Contador por role
-          "updated": <int> # Cantidad de dataSources actualizados en la DB
+          "updated": <int>, # Cantidad de dataSources actualizados en la DB
+          "skipped_roled": <int> # Solo con only_missing_role: dataSources que ya tenian role
         }
     """
     # Obtener el documento de la compañía
-    doc = get_platform_by_slug(
-        slug=slug,
-        projection={"_id": 0, "primaryDomain": 1, "dataSources.url": 1, "dataSources.role": 1}
-    )
+    if only_missing_role:
+        doc = get_unroled_datasources(slug)
+    else:
+        doc = get_platform_by_slug(slug=slug, projection=_PROJ_CLASSIFY)
+
+    stats, pending = _classify_datasources(slug, doc, target_roles, only_missing_role)
+
+    # Actualizar todos los roles en la DB en una sola ida
+    if pending:
+        stats["updated"] = datasource_role_bulk(pending)["modified"]
     
+    return stats
+
+
+async def aclassify_role_platform_datasources(
+    slug: str,
+    target_roles: Optional[List[str]] = None,
+    only_missing_role: bool = False
+) -> Dict[str, Any]:
+    """
+    Version async (Motor) de classify_role_platform_datasources.
+    La lectura y el bulk_write no bloquean el event loop, asi el caller puede
+    hacer asyncio.gather sobre muchas compañías (acotado por el pool de conexiones).
+    Mismo input y output que la version sincrona.
+    """
+    if only_missing_role:
+        doc = await aget_unroled_datasources(slug)
+    else:
+        doc = await aget_platform_by_slug(slug, _PROJ_CLASSIFY)
+
+    stats, pending = _classify_datasources(slug, doc, target_roles, only_missing_role)
+
+    if pending:
+        stats["updated"] = (await adatasource_role_bulk(pending))["modified"]
+
+    return stats
+
+
+def _classify_datasources(
+    slug: str,
+    doc: Optional[Dict[str, Any]],
+    target_roles: Optional[List[str]],
+    only_missing_role: bool
+) -> Tuple[Dict[str, Any], List[Tuple[str, str, str]]]:
+    """
+    Parte comun (sin I/O) de classify_role_platform_datasources y su version async.
+    Retorna (stats, pending), con pending = [(slug, url, role)] a escribir en la DB.
+    """
     if not doc:
         return {
             "processed": 0,
@@ -50,12 +120,22 @@ def classify_role_platform_datasources(
             "roles_found": {},
             "updated": 0,
             "error": "Company no encontrada"
-        }
+        }, []
     
     primary_domain = doc.get("primaryDomain") or ""
     data_sources = doc.get("dataSources") or []
     
     if not data_sources:
+        if only_missing_role and doc.get("roledCount"):
+            # Todos los dataSources ya tienen role: nada que clasificar
+            return {
+                "processed": 0,
+                "classified": 0,
+                "not_classified": 0,
+                "roles_found": {},
+                "updated": 0,
+                "skipped_roled": doc["roledCount"]
+            }, []
         return {
             "processed": 0,
             "classified": 0,
@@ -63,14 +143,10 @@ def classify_role_platform_datasources(
             "roles_found": {},
             "updated": 0,
             "error": "No se encontraron dataSources"
-        }
+        }, []
     
-    # Validar target_roles
-    available_roles = get_available_roles()
-    if target_roles:
-        target_roles = [r for r in target_roles if r in available_roles]
-        if not target_roles:
-            target_roles = None  # Si ninguno es válido, usar todos
+    # Validar target_roles (si ninguno es válido, usar todos)
+    target_roles = _validate_target_roles(target_roles)
     
     stats = {
         "processed": 0,
@@ -79,39 +155,35 @@ def classify_role_platform_datasources(
         "roles_found": {},
         "updated": 0
     }
+    if only_missing_role:
+        stats["skipped_roled"] = doc.get("roledCount", 0)
+
+    # (url tal como esta en la DB, url sin espacios) de los dataSources validos, en orden
+    urls = [
+        (ds["url"], ds["url"].strip()) for ds in data_sources
+        if isinstance(ds, dict) and isinstance(ds.get("url"), str) and ds["url"].strip()
+    ]
+
+    # Clasificar todas las URLs de una vez (plan de roles resuelto una vez, URLs repetidas una sola vez)
+    roles = classify_batch((url for _, url in urls), primary_domain, target_roles)
+
+    # (slug, url, role) a escribir; se envian todos juntos al final en un solo bulk_write
+    pending = []
     
     # Procesar cada dataSource
-    for ds in data_sources:
-        if not isinstance(ds, dict):
-            continue
-        
-        datasource_url = ds.get("url")
-        if not isinstance(datasource_url, str) or not datasource_url.strip():
-            continue
-        
+    for datasource_url, url in urls:
         stats["processed"] += 1
         
-        # Clasificar la URL principal del dataSource
-        role = classify_url(datasource_url.strip(), primary_domain, target_roles)
+        role = roles[url]
         
         if role:
             stats["classified"] += 1
             stats["roles_found"][role] = stats["roles_found"].get(role, 0) + 1
-            
-            # Actualizar el role en la DB usando la función existente
-            result = datasource_role(
-                slug=slug,
-                datasource_url=datasource_url,
-                action="set",
-                role=role
-            )
-            
-            if result.get("modified", 0) > 0:
-                stats["updated"] += 1
+            pending.append((slug, datasource_url, role))
         else:
             stats["not_classified"] += 1
-    
-    return stats
+
+    return stats, pending
 
 
 def classify_role_single_datasource(
@@ -157,11 +229,7 @@ def classify_role_single_datasource(
     primary_domain = doc.get("primaryDomain") or ""
     
     # Validar target_roles
-    available_roles = get_available_roles()
-    if target_roles:
-        target_roles = [r for r in target_roles if r in available_roles]
-        if not target_roles:
-            target_roles = None
+    target_roles = _validate_target_roles(target_roles)
     
     # Clasificar la URL
     role = classify_url(datasource_url.strip(), primary_domain, target_roles)
@@ -206,38 +274,8 @@ def get_datasources_by_role(
     Output:
       - Lista de dicts con formato [{"url": "...", "role": "..."}, ...]
     """
-    doc = get_platform_by_slug(
-        slug=slug,
-        projection={"_id": 0, "dataSources.url": 1, "dataSources.role": 1}
-    )
-    
-    if not doc or "dataSources" not in doc:
-        return []
-    
-    data_sources = doc.get("dataSources") or []
-    result = []
-    
-    for ds in data_sources:
-        if not isinstance(ds, dict):
-            continue
-        
-        datasource_url = ds.get("url")
-        datasource_role_value = ds.get("role")
-        
-        if not isinstance(datasource_url, str) or not datasource_url.strip():
-            continue
-        
-        # Filtrar por role si se especifica
-        if role is not None:
-            if datasource_role_value != role:
-                continue
-        
-        result.append({
-            "url": datasource_url.strip(),
-            "role": datasource_role_value
-        })
-    
-    return result
+    # El filtro por role y la validacion de urls corren en MongoDB
+    return get_datasource_roles(slug, role)
 
 
 def clear_all_platform_roles(slug: str, target_roles: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -257,6 +295,10 @@ def clear_all_platform_roles(slug: str, target_roles: Optional[List[str]] = None
           "not_found": <int>,   # DataSources que no tenían role (o no coincidían con target)
           "updated": <int>      # Cantidad de dataSources actualizados en la DB
         }
+
+    Nota: el update es un solo update_one, que solo reporta modified a nivel documento (0 o 1).
+    "updated" se deriva de "cleared" (contado sobre la lectura fresca) cuando el documento
+    se modificó, así que es aproximado si otro proceso escribe roles entre la lectura y el update.
     """
     # Obtener el documento de la compañía
     doc = get_platform_by_slug(
@@ -290,6 +332,9 @@ def clear_all_platform_roles(slug: str, target_roles: Optional[List[str]] = None
         "not_found": 0,
         "updated": 0
     }
+
+    # Constantes de la llamada, resueltas una vez fuera del loop
+    target_set = set(target_roles) if target_roles is not None else None
     
     # Procesar cada dataSource
     for ds in data_sources:
@@ -302,29 +347,19 @@ def clear_all_platform_roles(slug: str, target_roles: Optional[List[str]] = None
         
         stats["processed"] += 1
         
-        # Verificar si tiene role
-        has_role = ds.get("role") is not None
+        # Verificar si tiene role (y si está en target_roles, cuando se especificaron)
         current_role = ds.get("role")
-        
-        if has_role:
-            # Si se especificaron target_roles, verificar si el role actual está en la lista
-            if target_roles is not None and current_role not in target_roles:
-                stats["not_found"] += 1
-                continue
-
-            stats["cleared"] += 1
-            
-            # Eliminar el role usando datasource_role con action="delete"
-            result = datasource_role(
-                slug=slug,
-                datasource_url=datasource_url,
-                action="delete"
-            )
-            
-            if result.get("modified", 0) > 0:
-                stats["updated"] += 1
-        else:
+        if current_role is None or (target_set is not None and current_role not in target_set):
             stats["not_found"] += 1
+            continue
+
+        stats["cleared"] += 1
+
+    # Eliminar todos los roles en la DB con un solo update (arrayFilters elige los elementos)
+    if stats["cleared"]:
+        result = datasource_role_clear(slug, target_roles)
+        if result["modified"] > 0:
+            stats["updated"] = stats["cleared"]
     
     return stats
 
@@ -1,10 +1,17 @@
 """
 Centralized lists of domains and patterns for URL classification and filtering.
 Used by RoleClassifier, DataFilter and other analyzers.
+
+Las listas son tuplas inmutables: las de extensiones se pasan directo a str.endswith,
+y para calzar un host exacto se usan los frozenset *_DOMAINS_SET de abajo.
 """
 
+import re
+import sys
+from functools import lru_cache
+
 # SOCIAL MEDIA
-SOCIAL_PROFILE_DOMAINS = [
+SOCIAL_PROFILE_DOMAINS = (
     "linkedin.com/company/", "linkedin.com/in/",
     "instagram.com/", "youtube.com/@", "youtube.com/c/", "youtube.com/channel/",
     "twitter.com/", "x.com/",
@@ -18,37 +25,37 @@ SOCIAL_PROFILE_DOMAINS = [
     "discord.gg/", "discord.com/",
     "wa.me/", "whatsapp.com/",
     "threads.net/", "farcaster.xyz/", "notion.site/"
-]
+)
 
-SOCIAL_GENERIC_DOMAINS = [
+SOCIAL_GENERIC_DOMAINS = (
     "linkedin.com", "instagram.com", "youtube.com", "twitter.com", "x.com",
     "facebook.com", "fb.com", "tiktok.com", "github.com", "medium.com", 
     "pinterest.com", "spotify.com", "telegram.me", "t.me", "discord.gg", 
     "discord.com", "wa.me", "whatsapp.com", "threads.net", "farcaster.xyz", 
     "notion.site"
-]
+)
 
-SOCIAL_CONTENT_PATTERNS = [
+SOCIAL_CONTENT_PATTERNS = (
     "/post/", "/video/", "/watch", "/status/", "/p/", "/reel/",
     "/photo/", "/album/", "/story/"
-]
+)
 
-SOCIAL_SHARING_PATTERNS = [
+SOCIAL_SHARING_PATTERNS = (
     "sharer", "intent/tweet", "share/url", "send?text="
-]
+)
 
 # APP STORES
-STORE_DOMAINS = [
+STORE_DOMAINS = (
     "play.google.com",
     "play.google.com/store",
     "apps.apple.com",
     "microsoft.com/store",
     "galaxy.store",
     "appgallery.huawei.com"
-]
+)
 
 # REGULATORS / LEGAL
-REGULATOR_DOMAINS = [
+REGULATOR_DOMAINS = (
     "register.fca.org.uk", "fca.org.uk",
     "sec.gov", "finra.org",
     "cftc.gov", "fincen.gov",
@@ -58,12 +65,12 @@ REGULATOR_DOMAINS = [
     "fsra.ae", "dfsa.ae", "sca.gov.ae",
     "vara.ae", "ecsp.com",
     "sii.cl"
-]
+)
 
-REGULATOR_PROFILE_INDICATORS = ["firm", "register", "company", "entity", "license"]
+REGULATOR_PROFILE_INDICATORS = ("firm", "register", "company", "entity", "license")
 
 # NEWS AND MEDIA
-NEWS_DOMAINS = [
+NEWS_DOMAINS = (
     "bbc.com", "cnn.com", "reuters.com", "bloomberg.com",
     "forbes.com", "techcrunch.com", "businessinsider.com",
     "wsj.com", "nytimes.com", "theguardian.com",
@@ -71,31 +78,118 @@ NEWS_DOMAINS = [
     "df.cl", "t13.cl", "nexnews.cl", "fintechile.org",
     "energiesmedia.com", "chocale.cl", "axios.com",
     "pauta.cl", "theclinic.cl"
-]
+)
 
 # THIRD PARTY DIRECTORIES
-THIRD_PARTY_DOMAINS = [
+THIRD_PARTY_DOMAINS = (
     "crunchbase.com", "trustpilot.com", "thecrowdspace.com",
     "producthunt.com", "g2.com", "capterra.com", "airbnb.cl"
-]
+)
 
 # WEB UTILITIES / RESOURCES / MULTIMEDIA
-IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico"]
-VIDEO_EXTENSIONS = [".mp4", ".webm", ".avi", ".mov", ".mkv"]
-RESOURCE_PATHS = ["/assets/", "/static/", "/images/", "/img/", "/css/", "/js/", "/fonts/"]
-CDN_DOMAINS = [
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".ico")
+VIDEO_EXTENSIONS = (".mp4", ".webm", ".avi", ".mov", ".mkv")
+RESOURCE_PATHS = ("/assets/", "/static/", "/images/", "/img/", "/css/", "/js/", "/fonts/")
+CDN_DOMAINS = (
     "cdn.", "static.", "assets.", "media.", 
     "intercomcdn.com", "digitaloceanspaces.com"
-]
+)
 
 # DOCUMENTS
-DOCUMENT_EXTENSIONS = [
+DOCUMENT_EXTENSIONS = (
     ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
     ".txt", ".csv", ".zip", ".rar", ".7z"
-]
+)
 
 # TO BE IGNORED
-IGNORE_DOMAINS = [
+IGNORE_DOMAINS = (
     "intercom.com",
     "googleapis.com"
-]
+)
+
+
+# Versiones normalizadas para busquedas por host (lowercase + sys.intern, armadas una vez al importar)
+def _domain_set(domains):
+    return frozenset(sys.intern(d.strip().lower()) for d in domains)
+
+
+SOCIAL_GENERIC_DOMAINS_SET = _domain_set(SOCIAL_GENERIC_DOMAINS)
+STORE_DOMAINS_SET = _domain_set(STORE_DOMAINS)
+REGULATOR_DOMAINS_SET = _domain_set(REGULATOR_DOMAINS)
+NEWS_DOMAINS_SET = _domain_set(NEWS_DOMAINS)
+THIRD_PARTY_DOMAINS_SET = _domain_set(THIRD_PARTY_DOMAINS)
+CDN_DOMAINS_SET = _domain_set(CDN_DOMAINS)
+IGNORE_DOMAINS_SET = _domain_set(IGNORE_DOMAINS)
+
+# Extensiones como sets: la extension de una URL se corta una vez (url_extension)
+# y se busca en O(1), en vez de probar cada sufijo con endswith
+# Cada extension tiene un solo punto, asi "termina en .pdf" == "lo que sigue al ultimo punto es .pdf"
+IMAGE_EXTENSIONS_SET = frozenset(IMAGE_EXTENSIONS)
+VIDEO_EXTENSIONS_SET = frozenset(VIDEO_EXTENSIONS)
+MEDIA_EXTENSIONS_SET = IMAGE_EXTENSIONS_SET | VIDEO_EXTENSIONS_SET
+DOCUMENT_EXTENSIONS_SET = frozenset(DOCUMENT_EXTENSIONS)
+
+
+def url_extension(url_lower):
+    """Sufijo desde el ultimo punto de la URL ('' si no tiene punto). Ej: '.pdf'."""
+    i = url_lower.rfind(".")
+    return url_lower[i:] if i != -1 else ""
+
+
+# Dominios puros (social generico, noticias, reguladores) se calzan por host con un trie
+# en role_classifier; aqui quedan las listas con paths o fragmentos.
+# Una regex compilada por lista: "algun patron aparece en el string" en una sola pasada en C,
+# en vez de any(p in s for p in LISTA). Los patrones ya estan en minusculas (comparar contra url.lower()).
+# La alternancia se arma factorizando prefijos comunes (trie): en cada posicion del string
+# el motor compara cada prefijo compartido una vez, en vez de probar todas las ramas
+# (ej: "linkedin.com|linktr.ee" -> "lin(?:kedin\.com|ktr\.ee)"). Solo se usa search() como si/no,
+# asi que el orden de las ramas no cambia el resultado.
+def _any_of(patterns, prefix=""):
+    trie = {}
+    for p in set(patterns):
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # fin de patron
+    return re.compile(f"{prefix}(?:{_trie_regex(trie)})")
+
+
+def _trie_regex(node):
+    # "" (fin de patron) primero: si ya calzo un patron completo, no hace falta seguir
+    if "" in node:
+        return ""
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items())]
+    return branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+
+
+# Perfil social: el dominio debe ir al inicio o despues de '.', '/' o ':' (evita box.com -> x.com)
+SOCIAL_PROFILE_RE = _any_of(SOCIAL_PROFILE_DOMAINS, prefix=r"(?:^|(?<=[./:]))")
+SOCIAL_CONTENT_RE = _any_of(SOCIAL_CONTENT_PATTERNS)
+SOCIAL_SHARING_RE = _any_of(SOCIAL_SHARING_PATTERNS)
+STORE_RE = _any_of(STORE_DOMAINS)
+REGULATOR_PROFILE_RE = _any_of(REGULATOR_PROFILE_INDICATORS)
+THIRD_PARTY_RE = _any_of(THIRD_PARTY_DOMAINS)
+RESOURCE_PATHS_RE = _any_of(RESOURCE_PATHS)
+CDN_RE = _any_of(CDN_DOMAINS)
+
+# Nombre -> regex de las listas que se buscan sobre la URL completa (en minusculas)
+URL_PATTERN_RES = {
+    "social_profile": SOCIAL_PROFILE_RE,
+    "social_content": SOCIAL_CONTENT_RE,
+    "social_sharing": SOCIAL_SHARING_RE,
+    "store": STORE_RE,
+    "regulator_profile": REGULATOR_PROFILE_RE,
+    "third_party": THIRD_PARTY_RE,
+    "resource_path": RESOURCE_PATHS_RE,
+}
+
+
+@lru_cache(maxsize=8192)
+def url_pattern_hits(url_lower):
+    """
+    Nombres de las listas (claves de URL_PATTERN_RES) con algun patron presente en url_lower.
+    Se escanea la URL una sola vez por lista y se cachea: los clasificadores de roles
+    consultan varias listas por URL (third_party revisa todas las demas) sin volver a escanear.
+    """
+    return frozenset(name for name, rx in URL_PATTERN_RES.items() if rx.search(url_lower))
+
@@ -1,8 +1,12 @@
 import asyncio
+import sys
+from itertools import chain
 from src.scrapers.page_deep_scraper import page_deep_scraper
 from src.scrapers.model_builder import page_deep_scraped_to_model
 import data_filter as filter
 
+SECTIONS = ("head", "header", "main", "footer")
+
 async def main():
     root_links = set()
     social_links = set()
@@ -17,58 +21,46 @@ async def main():
     to_be_ignored_links = set()
 
     deep_scrap = await page_deep_scraper("https://reity.cl")
-    root_domain = deep_scrap["rootDomain"]
+    # Host del dominio raiz calculado una sola vez para todos los links
+    root_host = deep_scrap["rootDomain"].lower()
     result = page_deep_scraped_to_model(deep_scrap) #toDataSource
 
-    for r in result:
-        for section in ("head", "header", "main", "footer"):
-            for link in r["links"].get(section, []):
-                if filter.is_in_root_domain(link, root_domain):
-                    root_links.add(link)
-                elif filter.is_app_store(link):
-                    app_links.add(link)
-                elif filter.is_youtube_profile(link) or filter.is_social_media(link):
-                    social_links.add(link)
-                elif filter.is_youtube_video(link) or filter.is_multimedia(link):
-                    multimedia_links.add(link)
-                elif filter.is_news(link):
-                    news_links.add(link)
-                elif filter.is_property(link):
-                    property_links.add(link)
-                elif filter.is_legal(link):
-                    legal_links.add(link)
-                elif filter.is_to_be_ignored(link):
-                    to_be_ignored_links.add(link)
-                else:
-                    none_links.add(link)
-
-    print(f"\nROOT: {len(root_links)}")
-    for l in sorted(root_links): print(l)
-
-    print(f"\nSOCIAL: {len(social_links)}")
-    for l in sorted(social_links): print(l)
-
-    print(f"\nMULTIMEDIA: {len(multimedia_links)}")
-    for l in sorted(multimedia_links): print(l)
-
-    print(f"\nAPPS: {len(app_links)}")
-    for l in sorted(app_links): print(l)
-
-    print(f"\nNEWS: {len(news_links)}")
-    for l in sorted(news_links): print(l)
-
-    print(f"\nPROPERTY: {len(property_links)}")
-    for l in sorted(property_links): print(l)
-
-    print(f"\nLEGAL: {len(legal_links)}")
-    for l in sorted(legal_links): print(l)
-
-    # FLAG INTERNO
-    print(f"\nTO BE IGNORED: {len(to_be_ignored_links)}")
-    for l in sorted(to_be_ignored_links): print(l)
-
-    print(f"\nMISCELANEOUS: {len(none_links)}")
-    for l in sorted(none_links): print(l)
+    # Una sola pasada sobre todas las secciones; los links repetidos se clasifican una vez
+    links = set(chain.from_iterable(r["links"].get(section, ()) for r in result for section in SECTIONS))
+
+    # Una sola llamada para todos los links: cada link se parsea una vez
+    # y el dominio raiz se normaliza una sola vez (filter.classify_batch)
+    by_category = {
+        "root": root_links,
+        "app_store": app_links,
+        "social": social_links,
+        "multimedia": multimedia_links,
+        "news": news_links,
+        "property": property_links,
+        "legal": legal_links,
+        "to_be_ignored": to_be_ignored_links,
+        None: none_links,
+    }
+    # Un classify + un add por link (classify_batch solo retorna estas categorias o None)
+    for link, category in filter.classify_batch(links, root_host).items():
+        by_category[category].add(link)
+
+    sections = (
+        ("ROOT", root_links),
+        ("SOCIAL", social_links),
+        ("MULTIMEDIA", multimedia_links),
+        ("APPS", app_links),
+        ("NEWS", news_links),
+        ("PROPERTY", property_links),
+        ("LEGAL", legal_links),
+        ("TO BE IGNORED", to_be_ignored_links),  # FLAG INTERNO
+        ("MISCELANEOUS", none_links),
+    )
+    # Un solo write por seccion en vez de un print por link
+    for title, section_links in sections:
+        sys.stdout.write(f"\n{title}: {len(section_links)}\n")
+        if section_links:
+            sys.stdout.write("\n".join(sorted(section_links)) + "\n")
 
 
 if __name__ == "__main__":
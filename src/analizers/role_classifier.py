@@ -3,10 +3,61 @@ Módulo de clasificación de roles para URLs.
 Sistema flexible y extensible que permite agregar, modificar o eliminar criterios de clasificación.
 """
 
-from typing import Optional, List, Set, Callable
-from urllib.parse import urlparse
+from typing import Optional, List, FrozenSet, Tuple, Callable, Dict, Iterable
+from contextvars import ContextVar
+from functools import lru_cache
 import re
 from src.analizers import domain_lists
+from src.utils.domains import DomainTrie, host_matches, url_host
+
+
+# Listas que son solo dominios: se calzan por sufijo del host (trie de labels invertidos),
+# no como substring de la URL (evita falsos positivos como dropbox.com -> x.com o pdf.cl -> df.cl)
+def _build_host_trie() -> DomainTrie:
+    trie = DomainTrie()
+    for name, domains in (
+        ("social_generic", domain_lists.SOCIAL_GENERIC_DOMAINS_SET),
+        ("news", domain_lists.NEWS_DOMAINS_SET),
+        ("regulator", domain_lists.REGULATOR_DOMAINS_SET),
+    ):
+        for d in domains:
+            trie.insert(d, name)
+    return trie
+
+
+_HOST_TRIE = _build_host_trie()
+
+
+@lru_cache(maxsize=8192)
+def _host_lists(host: str) -> FrozenSet[str]:
+    """Listas (social_generic, news, regulator) cuyo dominio es sufijo del host."""
+    return _HOST_TRIE.match(host)
+
+
+# Resultados (url, primary_domain, target_roles) -> role recordados por RoleClassifier
+# Las mismas URLs (plantillas de redes, fichas de tiendas) se repiten entre scrapes
+CLASSIFY_CACHE_SIZE = 65536
+
+# Resultados de los clasificadores ya evaluados en la pasada actual de classify (funcion -> bool)
+# _is_third_party los reutiliza en vez de volver a evaluar a sus hermanos.
+# ContextVar: cada thread / task de asyncio tiene su propia pasada
+_pass_results: ContextVar[Optional[Dict[Callable, bool]]] = ContextVar("role_pass_results", default=None)
+
+# Esquema y host (todo antes del primer / ? #)
+_SCHEME_HOST_RE = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?[^/?#]*")
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _normalize_url(url: str) -> str:
+    """
+    URL con esquema/host en minusculas (el path y los espacios se mantienen igual).
+    Asi https://Instagram.com/foo y https://instagram.com/foo comparten entrada en el cache.
+    Los clasificadores por defecto solo miran la URL en minusculas o su host, asi que esto
+    no cambia su resultado; los espacios si (" x.png " no tiene extension .png) y no se tocan.
+    Cacheada: una llamada repetida a classify_url son dos lookups (esta y el LRU de resultados).
+    """
+    m = _SCHEME_HOST_RE.match(url)
+    return url[:m.end()].lower() + url[m.end():]
 
 
 class RoleClassifier:
@@ -17,7 +68,20 @@ class RoleClassifier:
     
     def __init__(self):
         self._classifiers: dict[str, List[Callable[[str, str], bool]]] = {}
+        # Caches derivados de _classifiers; se recalculan solo al registrar o eliminar
+        self._available: Optional[FrozenSet[str]] = None
+        self._plans: dict = {}
+        # Clasificadores que no lanzan excepciones con url/primary_domain str (los por defecto)
+        self._trusted: set = set()
+        # (url normalizada, primary_domain, target_roles) -> role; LRU por instancia
+        self._classify_cached = lru_cache(maxsize=CLASSIFY_CACHE_SIZE)(self._classify_uncached)
         self._setup_default_classifiers()
+
+    def _invalidate(self):
+        """Descarta los caches de roles tras un cambio en los clasificadores."""
+        self._available = None
+        self._plans = {}
+        self._classify_cached.cache_clear()
     
     def register_classifier(self, role: str, classifier_func: Callable[[str, str], bool]):
         """
@@ -30,6 +94,7 @@ class RoleClassifier:
         if role not in self._classifiers:
             self._classifiers[role] = []
         self._classifiers[role].append(classifier_func)
+        self._invalidate()
     
     def remove_classifier(self, role: str, classifier_func: Optional[Callable] = None):
         """
@@ -42,6 +107,7 @@ class RoleClassifier:
         if role not in self._classifiers:
             return
         
+        self._invalidate()
         if classifier_func is None:
             del self._classifiers[role]
         else:
@@ -51,9 +117,11 @@ class RoleClassifier:
             if not self._classifiers[role]:
                 del self._classifiers[role]
     
-    def get_available_roles(self) -> Set[str]:
-        """Retorna el conjunto de roles disponibles."""
-        return set(self._classifiers.keys())
+    def get_available_roles(self) -> FrozenSet[str]:
+        """Retorna el conjunto (inmutable, cacheado) de roles disponibles."""
+        if self._available is None:
+            self._available = frozenset(self._classifiers)
+        return self._available
     
     def classify(self, url: str, primary_domain: str, target_roles: Optional[List[str]] = None) -> Optional[str]:
         """
@@ -67,35 +135,104 @@ class RoleClassifier:
         Returns:
             Nombre del role si se encuentra una coincidencia, None si no se clasifica.
             Si ningún role coincide y "unclassified" está disponible, retorna "unclassified".
+
+        Con solo clasificadores por defecto el resultado se cachea por (URL con esquema/host
+        en minusculas, primary_domain, target_roles). Si el plan incluye un clasificador
+        personalizado, se evalua sin cache y con la URL tal cual llego (puede no ser puro
+        o distinguir mayusculas). Un primary_domain no hasheable tambien se evalua sin cache.
         """
         if not isinstance(url, str) or not url.strip():
             return None
         
-        roles_to_check = target_roles if target_roles else list(self._classifiers.keys())
-        
-        # Primero intentar todos los roles excepto "unclassified"
-        roles_to_try = [r for r in roles_to_check if r != "unclassified"]
-        has_unclassified = "unclassified" in roles_to_check
-        
-        for role in roles_to_try:
-            if role not in self._classifiers:
-                continue
-            
-            for classifier in self._classifiers[role]:
-                try:
-                    if classifier(url, primary_domain):
+        # Roles a intentar (todos excepto "unclassified"), resueltos una vez por target_roles
+        roles_key = tuple(target_roles) if target_roles else None
+        if self._plan(roles_key)[2]:
+            return self._classify_uncached(url, primary_domain, roles_key)
+        try:
+            return self._classify_cached(_normalize_url(url), primary_domain, roles_key)
+        except TypeError:
+            # primary_domain no hasheable (ej: una lista): no puede ser key del LRU
+            return self._classify_uncached(url, primary_domain, roles_key)
+
+    def _classify_uncached(self, url: str, primary_domain: str, roles_key: Optional[Tuple[str, ...]]) -> Optional[str]:
+        """
+        Evalua el plan de roles_key sobre una URL.
+        Se llama via self._classify_cached (LRU, URL normalizada) o directo cuando no se
+        puede cachear (ver classify); el orden de target_roles es parte de la key porque
+        define la prioridad entre roles.
+        """
+        pipeline, has_unclassified, guarded = self._plan(roles_key)
+        seen: Dict[Callable, bool] = {}
+        token = _pass_results.set(seen)
+        try:
+            # Un solo recorrido plano (role, funcion) en orden de prioridad
+            if guarded:
+                for role, classifier in pipeline:
+                    try:
+                        matched = seen[classifier] = bool(classifier(url, primary_domain))
+                    except Exception:
+                        # Si un clasificador falla, continuar con el siguiente
+                        continue
+                    if matched:
+                        return role
+            else:
+                # Solo clasificadores por defecto: sin try/except por llamada
+                for role, classifier in pipeline:
+                    matched = seen[classifier] = bool(classifier(url, primary_domain))
+                    if matched:
                         return role
-                except Exception:
-                    # Si un clasificador falla, continuar con el siguiente
-                    continue
+        finally:
+            _pass_results.reset(token)
         
         # Si no se encontró ningún role y "unclassified" está en target_roles, retornar "unclassified"
         # Nota: "unclassified" solo se aplica si está explícitamente en target_roles
-        if has_unclassified:
-            return "unclassified"
-        
-        return None
+        return "unclassified" if has_unclassified else None
     
+    def _plan(self, target_roles: Optional[Tuple[str, ...]]):
+        """
+        Tupla plana de (role, funcion) a evaluar en orden de prioridad, si aplica "unclassified"
+        y si hace falta try/except (hay algun clasificador personalizado). Se arma una vez por combinacion de target_roles (el orden importa) y se cachea;
+        register_classifier / remove_classifier la descartan (_invalidate).
+        """
+        plan = self._plans.get(target_roles)
+        if plan is None:
+            roles = target_roles if target_roles else tuple(self._classifiers)
+            pipeline = tuple(
+                (role, func)
+                for role in roles
+                if role != "unclassified" and role in self._classifiers
+                for func in self._classifiers[role]
+            )
+            guarded = any(func not in self._trusted for _, func in pipeline)
+            plan = (pipeline, "unclassified" in (target_roles or self._classifiers), guarded)
+            self._plans[target_roles] = plan
+        return plan
+
+    def make_classifier(self, primary_domain: str, target_roles: Optional[List[str]] = None) -> Callable[[str], Optional[str]]:
+        """
+        Retorna una funcion url -> role especializada para un primary_domain y target_roles.
+        Los roles a evaluar y sus funciones se resuelven una sola vez; usar cuando se
+        clasifican muchas URLs de la misma empresa. Mismo resultado que classify().
+        """
+        roles_key = tuple(target_roles) if target_roles else None
+        cacheable = not self._plan(roles_key)[2]
+        if cacheable:
+            try:
+                hash(primary_domain)
+            except TypeError:
+                cacheable = False
+        if not cacheable:
+            # Clasificador personalizado o primary_domain no hasheable: camino sin cache de classify()
+            return lambda url: self.classify(url, primary_domain, target_roles)
+        classify_cached = self._classify_cached
+
+        def _classify(url: str) -> Optional[str]:
+            if not isinstance(url, str) or not url.strip():
+                return None
+            return classify_cached(_normalize_url(url), primary_domain, roles_key)
+
+        return _classify
+
     def _setup_default_classifiers(self):
         """Configura los clasificadores por defecto según VERSION 2 del modelo."""
         
@@ -147,75 +284,86 @@ class RoleClassifier:
             return False
 
         self.register_classifier("unclassified", _always_false) 
+
+        # Los clasificadores por defecto solo usan operaciones de str y lookups cacheados:
+        # no lanzan excepciones y classify los llama sin try/except
+        self._trusted.update(f for funcs in self._classifiers.values() for f in funcs)
+        self._invalidate()
     
 
+    def _sibling(self, check: Callable[[str, str], bool], url: str, primary_domain: str) -> bool:
+        """
+        Resultado de otro predicado sobre la misma URL.
+        Dentro de una pasada de classify se evalua una sola vez y se reutiliza
+        (ej: social_profile y social_content comparten el chequeo de perfil oficial).
+        """
+        seen = _pass_results.get()
+        if seen is None:
+            return bool(check(url, primary_domain))
+        if check not in seen:
+            seen[check] = bool(check(url, primary_domain))
+        return seen[check]
+
     # ============================================================
     # CLASIFICADORES POR ROLE
     # ============================================================
     
     def _is_official_site(self, url: str, primary_domain: str) -> bool:
         """Verifica si la URL pertenece al sitio oficial de la empresa."""
-        url_host = self._extract_host(url)
+        url_host = _host_of(url)
         domain_host = self._normalize_domain(primary_domain)
         
         if not url_host or not domain_host:
             return False
         
         # Coincidencia exacta o subdominio
-        return url_host == domain_host or url_host.endswith("." + domain_host)
+        return host_matches(url_host, domain_host)
     
     def _is_official_social_profile(self, url: str, primary_domain: str) -> bool:
         """Verifica si es un perfil oficial de la empresa en redes sociales."""
-        url_lower = url.lower()
+        url_lower = _url_lower(url)
 
         # Check filter: if it is a social web utility (sharing link), it is NOT a profile
-        if self._is_social_web_utility(url, primary_domain):
+        if self._sibling(self._is_social_web_utility, url, primary_domain):
             return False
         
         # Verifica que sea una red social conocida con coincidencia exacta de dominio
-        is_social = False
-        for domain in domain_lists.SOCIAL_PROFILE_DOMAINS:
-            idx = url_lower.find(domain)
-            if idx != -1:
-                # Verificar delimitadores para evitar falsos positivos (ej: box.com vs x.com)
-                # El dominio debe estar al inicio o precedido por '.', '/', ':'
-                if idx == 0 or url_lower[idx-1] in [".", "/", ":"]:
-                    is_social = True
-                    break
+        # El dominio debe estar al inicio o precedido por '.', '/', ':' (evita box.com vs x.com)
+        is_social = "social_profile" in domain_lists.url_pattern_hits(url_lower)
         
         if not is_social:
             return False
         
         # Para perfiles oficiales, típicamente el nombre de la empresa aparece en la URL
         # o el dominio de la empresa está referenciado
-        domain_parts = self._normalize_domain(primary_domain).split(".")[0]
-        if domain_parts and len(domain_parts) > 2:
+        domain_head = _domain_head(primary_domain) if isinstance(primary_domain, str) else ""
+        if domain_head:
             # Busca el nombre de la empresa en la URL
-            return domain_parts.lower() in url_lower
+            return domain_head in url_lower
+        return False
     
     def _is_official_social_content(self, url: str, primary_domain: str) -> bool:
         """Verifica si es contenido oficial en redes sociales (posts, videos, etc)."""
         # Similar a official_social_profile pero para contenido específico
-        if self._is_official_social_profile(url, primary_domain):
+        if self._sibling(self._is_official_social_profile, url, primary_domain):
             # Si ya es un perfil oficial, verifica si es contenido específico
-            return any(pattern in url.lower() for pattern in domain_lists.SOCIAL_CONTENT_PATTERNS)
+            return "social_content" in domain_lists.url_pattern_hits(_url_lower(url))
         return False
     
     def _is_social_profile(self, url: str, primary_domain: str) -> bool:
         """Verifica si es un perfil en redes sociales pero NO oficial."""
-        url_lower = url.lower()
-        is_social = any(domain in url_lower for domain in domain_lists.SOCIAL_GENERIC_DOMAINS)
+        is_social = "social_generic" in _host_lists(_host_of(url))
         
         if not is_social:
             return False
         
         # Si es social pero NO es oficial, entonces es social_profile
-        return not self._is_official_social_profile(url, primary_domain)
+        return not self._sibling(self._is_official_social_profile, url, primary_domain)
     
     def _is_social_content(self, url: str, primary_domain: str) -> bool:
         """Verifica si es contenido en redes sociales NO oficial."""
-        if self._is_social_profile(url, primary_domain):
-            return any(pattern in url.lower() for pattern in domain_lists.SOCIAL_CONTENT_PATTERNS)
+        if self._sibling(self._is_social_profile, url, primary_domain):
+            return "social_content" in domain_lists.url_pattern_hits(_url_lower(url))
         return False
 
     def _is_social_web_utility(self, url: str, primary_domain: str) -> bool:
@@ -223,157 +371,185 @@ class RoleClassifier:
         Verifica si es una utilidad de red social (ej: compartir, tweet intent).
         Generalmente tienen doble https o patrones específicos de compartir.
         """
-        url_lower = url.lower()
+        url_lower = _url_lower(url)
         
         # Patrón 1: Doble https (común en redirects de compartir)
         if url_lower.count("http") > 1:
             return True
             
         # Patrón 2: Keywords de compartir
-        return any(pattern in url_lower for pattern in domain_lists.SOCIAL_SHARING_PATTERNS)
+        return "social_sharing" in domain_lists.url_pattern_hits(url_lower)
     
     def _is_store_listing(self, url: str, primary_domain: str) -> bool:
         """Verifica si es una tienda de aplicaciones."""
-        url_lower = url.lower()
-        return any(domain in url_lower for domain in domain_lists.STORE_DOMAINS)
+        url_lower = _url_lower(url)
+        return "store" in domain_lists.url_pattern_hits(url_lower)
     
     def _is_regulator_profile(self, url: str, primary_domain: str) -> bool:
         """Verifica si es la ficha/registro de la empresa en un regulador."""
-        url_lower = url.lower()
-        is_regulator = any(domain in url_lower for domain in domain_lists.REGULATOR_DOMAINS)
+        url_lower = _url_lower(url)
+        is_regulator = "regulator" in _host_lists(_host_of(url))
         
         if not is_regulator:
             return False
         
-        return any(indicator in url_lower for indicator in domain_lists.REGULATOR_PROFILE_INDICATORS)
+        return "regulator_profile" in domain_lists.url_pattern_hits(url_lower)
     
     def _is_regulator_reference(self, url: str, primary_domain: str) -> bool:
         """Verifica si es una página de regulación genérica (no específica de la empresa)."""
-        url_lower = url.lower()
-        is_regulator = any(domain in url_lower for domain in domain_lists.REGULATOR_DOMAINS)
+        is_regulator = "regulator" in _host_lists(_host_of(url))
         
         if not is_regulator:
             return False
         
         # Si es regulador pero NO es un perfil específico, es referencia genérica
-        return not self._is_regulator_profile(url, primary_domain)
+        return not self._sibling(self._is_regulator_profile, url, primary_domain)
     
     def _is_news_site(self, url: str, primary_domain: str) -> bool:
         """Verifica si es un portal de noticias o medio de comunicación."""
-        url_lower = url.lower()
-        return any(domain in url_lower for domain in domain_lists.NEWS_DOMAINS)
+        return "news" in _host_lists(_host_of(url))
     
     def _is_third_party(self, url: str, primary_domain: str) -> bool:
         """Verifica si es una página de terceros que referencia a la empresa."""
         # Si no es oficial, no es social, no es regulador, no es noticias, etc.
         # y el dominio de la empresa aparece en la URL o contexto, podría ser third_party
         
-        # Excluir categorías ya clasificadas
-        excluded = [
-            self._is_official_site(url, primary_domain),
-            self._is_official_social_profile(url, primary_domain),
-            self._is_social_profile(url, primary_domain),
-            self._is_store_listing(url, primary_domain),
-            self._is_regulator_profile(url, primary_domain),
-            self._is_regulator_reference(url, primary_domain),
-            self._is_news_site(url, primary_domain),
-            self._is_web_utility(url, primary_domain),
-            self._is_document(url, primary_domain)
-        ]
-        
-        if any(excluded):
+        # Primero el patron propio (un lookup en los hits cacheados de la URL):
+        # la mayoria de las URLs no calza y se evita evaluar las exclusiones
+        url_lower = _url_lower(url)
+        if "third_party" not in domain_lists.url_pattern_hits(url_lower):
             return False
         
-        url_lower = url.lower()
-        return any(domain in url_lower for domain in domain_lists.THIRD_PARTY_DOMAINS)
+        # Excluir categorías ya clasificadas (any corta en la primera que calza)
+        excluded = (
+            self._is_official_site,
+            self._is_official_social_profile,
+            self._is_social_profile,
+            self._is_store_listing,
+            self._is_regulator_profile,
+            self._is_regulator_reference,
+            self._is_news_site,
+            self._is_web_utility,
+            self._is_document
+        )
+        
+        # Los ya evaluados en esta pasada de classify (roles anteriores) no se recalculan
+        return not any(self._sibling(check, url, primary_domain) for check in excluded)
     
     def _is_web_utility(self, url: str, primary_domain: str) -> bool:
         """Verifica si es un recurso interno (imágenes, videos, rutas internas)."""
-        url_lower = url.lower()
+        url_lower = _url_lower(url)
         
-        # Extensiones de imágenes
-        if any(url_lower.endswith(ext) for ext in domain_lists.IMAGE_EXTENSIONS):
-            return True
-        
-        # Extensiones de videos
-        if any(url_lower.endswith(ext) for ext in domain_lists.VIDEO_EXTENSIONS):
+        # Extensiones de imágenes y videos (un corte de la extension + lookup en set)
+        if domain_lists.url_extension(url_lower) in domain_lists.MEDIA_EXTENSIONS_SET:
             return True
         
         # Rutas de recursos comunes
-        if any(path in url_lower for path in domain_lists.RESOURCE_PATHS):
+        if "resource_path" in domain_lists.url_pattern_hits(url_lower):
             return True
         
         # URLs de CDN comunes
-        url_host = self._extract_host(url)
-        if url_host and any(cdn in url_host for cdn in domain_lists.CDN_DOMAINS):
+        url_host = _host_of(url)
+        if url_host and domain_lists.CDN_RE.search(url_host):
             return True
         
         return False
     
     def _is_document(self, url: str, primary_domain: str) -> bool:
         """Verifica si es una URL para descargar documentos."""
-        url_lower = url.lower()
+        url_lower = _url_lower(url)
         
-        return any(url_lower.endswith(ext) for ext in domain_lists.DOCUMENT_EXTENSIONS)
+        return domain_lists.url_extension(url_lower) in domain_lists.DOCUMENT_EXTENSIONS_SET
     
     # ============================================================
     # UTILIDADES
     # ============================================================
     
     def _extract_host(self, url: str) -> str:
-        """Extrae el host de una URL normalizado."""
+        """
+        Extrae el host de una URL normalizado (cacheado por URL, ver _host_of).
+        Los predicados reciben siempre un str y llaman a _host_of directo (sin lookup en self).
+        """
         if not isinstance(url, str):
             return ""
-        
-        url = url.strip()
-        if not url:
-            return ""
-        
-        # Agregar protocolo si falta
-        if "://" not in url:
-            url = "https://" + url
-        
-        try:
-            parsed = urlparse(url)
-            host = (parsed.netloc or "").lower()
-            
-            # Remover puerto
-            if ":" in host:
-                host = host.split(":")[0]
-            
-            # Remover www.
-            if host.startswith("www."):
-                host = host[4:]
-            
-            return host.strip(".")
-        except Exception:
-            return ""
+        return _host_of(url)
     
     def _normalize_domain(self, domain: str) -> str:
-        """Normaliza un dominio removiendo protocolo y www."""
+        """Normaliza un dominio removiendo protocolo y www (cacheado, ver _domain_of)."""
         if not isinstance(domain, str):
             return ""
-        
-        domain = domain.strip().lower()
-        if not domain:
-            return ""
-        
-        # Remover protocolo
-        domain = domain.replace("https://", "").replace("http://", "")
-        
-        # Remover www.
-        if domain.startswith("www."):
-            domain = domain[4:]
-        
-        # Remover ruta si existe
-        if "/" in domain:
-            domain = domain.split("/")[0]
-        
-        # Remover puerto
-        if ":" in domain:
-            domain = domain.split(":")[0]
-        
-        return domain.strip(".")
+        return _domain_of(domain)
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _url_lower(url: str) -> str:
+    """
+    url.lower() calculado una vez por URL: los predicados de una misma pasada
+    reciben el mismo string y comparten el resultado en vez de asignar uno nuevo cada uno.
+    str.lower ya tiene camino rapido para strings ASCII; pasar por bytes (encode + lower)
+    resulto mas lento y obligaria a los predicados a trabajar con bytes.
+    """
+    return url.lower()
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _host_of(url: str) -> str:
+    """
+    Host de una URL, calculado una vez por URL y compartido por todos los predicados
+    (third_party por si solo consulta el host de la misma URL varias veces).
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    
+    # Agregar protocolo si falta
+    if "://" not in url:
+        url = "https://" + url
+    
+    try:
+        # Sin puerto, credenciales ni www. (urlsplit, cacheado)
+        return url_host(url).strip(".")
+    except Exception:
+        return ""
+
+
+@lru_cache(maxsize=4096)
+def _domain_head(domain: str) -> str:
+    """
+    Primer label del primary_domain normalizado (nombre de la empresa, ej: "reity" de reity.cl).
+    "" si tiene 2 caracteres o menos (demasiado corto para buscarlo en una URL).
+    Se calcula una vez por empresa: los chequeos de perfiles sociales lo consultan en cada URL.
+    """
+    head = _domain_of(domain).split(".", 1)[0]
+    return head if len(head) > 2 else ""
+
+
+@lru_cache(maxsize=4096)
+def _domain_of(domain: str) -> str:
+    """primary_domain normalizado; se repite en cada URL de la misma empresa."""
+    domain = domain.strip().lower()
+    if not domain:
+        return ""
+    
+    # Remover protocolo (solo puede ir al inicio; removeprefix no recorre todo el string)
+    # Uno u otro, no ambos: "https://http://x" queda como "http://x"
+    if domain.startswith("https://"):
+        domain = domain.removeprefix("https://")
+    else:
+        domain = domain.removeprefix("http://")
+    
+    # Remover www.
+    domain = domain.removeprefix("www.")
+    
+    # Remover ruta y puerto si existen (cortar en el primer separador, sin armar listas)
+    cut = domain.find("/")
+    if cut != -1:
+        domain = domain[:cut]
+    cut = domain.find(":")
+    if cut != -1:
+        domain = domain[:cut]
+    
+    return domain.strip(".")
 
 
 # Instancia global del clasificador
@@ -395,7 +571,29 @@ def classify_url(url: str, primary_domain: str, target_roles: Optional[List[str]
     return _default_classifier.classify(url, primary_domain, target_roles)
 
 
-def get_available_roles() -> Set[str]:
+def make_classifier(primary_domain: str, target_roles: Optional[List[str]] = None) -> Callable[[str], Optional[str]]:
+    """
+    Función de conveniencia: clasificador url -> role especializado para una empresa.
+    Ver RoleClassifier.make_classifier.
+    """
+    return _default_classifier.make_classifier(primary_domain, target_roles)
+
+
+def classify_batch(urls: Iterable[str], primary_domain: str, target_roles: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Clasifica muchas URLs de una misma empresa. Retorna {url: role}.
+    El plan de roles se resuelve una vez y cada URL distinta se clasifica una sola vez
+    (mismo resultado que classify_url para cada una).
+    """
+    classify = _default_classifier.make_classifier(primary_domain, target_roles)
+    out: Dict[str, Optional[str]] = {}
+    for url in urls:
+        if url not in out:
+            out[url] = classify(url)
+    return out
+
+
+def get_available_roles() -> FrozenSet[str]:
     """Retorna el conjunto de roles disponibles."""
     return _default_classifier.get_available_roles()
 
@@ -3,7 +3,8 @@ import requests
 import logging
 from urllib.parse import urlparse, parse_qs, urlunparse, urlencode
 from typing import List, Dict, Any, Optional, Set
-from src.DB.platforms_querys import get_platform_by_slug, upsert_social_profile
+from src.DB.platforms_querys import get_platform_by_slug, upsert_social_profiles_bulk
+from src.utils.domains import host_matches, url_host
 
 # Timeout for requests
 TIMEOUT = 10
@@ -120,11 +121,9 @@ def analyze_and_store_social_profiles(slug: str) -> Dict[str, Any]:
             logging.warning(f"Company {slug} has multiple {plat} profiles: {count}")
 
     # 5. Store in DB
-    stored_count = 0
-    for p in valid_profiles:
-        # upsert_social_profile(slug, url, platform)
-        upsert_social_profile(slug, p['url'], p['platform'])
-        stored_count += 1
+    # All profiles go in a single bulk_write
+    upsert_social_profiles_bulk(slug, valid_profiles)
+    stored_count = len(valid_profiles)
         
     return {
         "candidates_found": len(candidates),
@@ -170,14 +169,11 @@ def _identify_platform(url: str) -> Optional[str]:
     Identifies the platform based on the domain.
     """
     try:
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        if domain.startswith("www."):
-            domain = domain[4:]
+        domain = url_host(url)
             
         # Strict check (exact match or subdomain)
         for key, plat in PLATFORM_MAPPING.items():
-            if domain == key or domain.endswith("." + key):
+            if host_matches(domain, key):
                 return plat
                 
         return None
@@ -252,7 +248,7 @@ def _clean_url(url: str) -> Optional[str]:
     # We iterate sorted by length desc to match specific domains first if any overlap exists (though keys are mostly unique)
     sorted_keys = sorted(PLATFORM_MAPPING.keys(), key=len, reverse=True)
     for key in sorted_keys:
-        if netloc == key or netloc.endswith("." + key):
+        if host_matches(netloc, key):
             netloc = key
             break
     
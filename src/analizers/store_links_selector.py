@@ -3,7 +3,8 @@ import requests
 from urllib.parse import urlparse, parse_qs, urlunparse, quote
 from typing import List, Dict, Optional, Set
 from src.analizers.datasource_role_classifier import get_datasources_by_role
-from src.DB.platforms_querys import upsert_mobile_app
+from src.DB.platforms_querys import upsert_mobile_apps_bulk
+from src.utils.domains import url_host
 
 # Timeout settings for requests
 TIMEOUT = 10
@@ -21,7 +22,7 @@ def process_and_store_mobile_apps(slug: str) -> Dict[str, int]:
     2. Analyzes them to find valid Store links (Google Play / App Store).
     3. Verifies they exist (status 200).
     4. Formats them for the model.
-    5. Updates the database (upsert_mobile_app).
+    5. Updates the database (upsert_mobile_apps_bulk).
     
     Returns a dictionary with statistics.
     """
@@ -39,14 +40,9 @@ def process_and_store_mobile_apps(slug: str) -> Dict[str, int]:
     formatted_links = _format_store_links_for_model(valid_links)
     
     # 5. Update DB
-    upserted_count = 0
-    for item in formatted_links:
-        url = item['url']
-        store = item['store']
-        # upsert_mobile_app returns {'matched': N, 'modified': N}
-        # We just count how many we processed successfully to the DB call
-        upsert_mobile_app(slug, url, store)
-        upserted_count += 1
+    # All apps go in a single bulk_write; we count how many were sent to the DB call
+    upsert_mobile_apps_bulk(slug, formatted_links)
+    upserted_count = len(formatted_links)
         
     return {
         "candidates_found": len(candidate_urls),
@@ -347,7 +343,7 @@ def _extract_nested_store_urls(url: str) -> List[str]:
 def _is_store_url(url: str) -> bool:
 
     try:
-        domain = urlparse(url).netloc.lower()
+        domain = url_host(url)
         return 'play.google.com' in domain or 'apps.apple.com' in domain or 'itunes.apple.com' in domain
     except:
         return False
@@ -32,7 +32,7 @@ def all_links_in_deep_scraped_page(deep_scraped):
     return all_links_in_deep_scraped_page
 
 
-async def page_deep_scraped_to_dataSources(page_deep_scraped):
+async def page_deep_scraped_to_dataSources(page_deep_scraped, use_cache: bool = False):
     
     #Crear lista con todos los links a los que se les extrajo links y textos.
     list_pages_scraped = []
@@ -59,7 +59,7 @@ async def page_deep_scraped_to_dataSources(page_deep_scraped):
     for links in links_for_scrap:
 
         try:
-            page_object = await page_scraper(links)
+            page_object = await page_scraper(links, use_cache=use_cache)
 
             dataSources.append({
                 "url": page_object["page"],
@@ -167,13 +167,14 @@ def data_to_identity(url=None, name=None, slug=None, primary_domain=None):
 
 
 
-async def from_url_model(url=None, name=None, slug=None, primary_domain=None):
+#use_cache=True reutiliza el HTML guardado en html_cache (hasta 24h) al reconstruir el mismo modelo
+async def from_url_model(url=None, name=None, slug=None, primary_domain=None, use_cache=False):
   
     identity = data_to_identity(url=url, name=name, slug=slug, primary_domain=primary_domain)
 
 
-    deep_scraped_page = await page_deep_scraper(url)
-    dataSources = await page_deep_scraped_to_dataSources(deep_scraped_page)
+    deep_scraped_page = await page_deep_scraper(url, use_cache=use_cache)
+    dataSources = await page_deep_scraped_to_dataSources(deep_scraped_page, use_cache=use_cache)
 
 
     model = {
@@ -1,4 +1,3 @@
-from urllib.parse import urlparse
 
 #BASE DE IMPORTACIONES PARA WORKFLOW
 """
@@ -17,8 +16,12 @@ from src.scrapers.utils.urls_format_from_domain import urls_format_from_domain
 from src.scrapers.utils.text_extractor_from_html import text_extractor_from_html
 """
 
+#Import estructura de la cola del crawl
+from collections import deque
+
 #Import lectura HTML
-from src.scrapers.utils.requestHTTP import fetch_html
+from src.scrapers.utils.requestHTTP import fetch_html, fetch_html_batch
+from src.scrapers.utils.html_cache import fetch_html_cached
 
 #import manejo de html
 from src.scrapers.utils.html_spliter_head_header_main_footer import html_spliter_head_header_main_footer
@@ -31,6 +34,9 @@ from src.scrapers.utils.urls_format_from_domain import urls_format_from_domain
 #import manejo de textos desde el html
 from src.scrapers.utils.text_extractor_from_html import text_extractor_from_html
 
+#Import comparacion de dominios
+from src.utils.domains import host_matches, registrable_domain, url_host
+
 
 
 def url_processor_from_html(html, url_base):
@@ -40,13 +46,18 @@ def url_processor_from_html(html, url_base):
     return url_list
 
 
+LINK_SECTIONS = ("head", "header", "main", "footer")
+
+
 def flatten_links(links_by_section: dict) -> list[str]:
-    out: list[str] = []
-    for section in ["head", "header", "main", "footer"]:
-        urls = links_by_section.get(section, [])
-        if isinstance(urls, list):
-            out.extend([u for u in urls if isinstance(u, str)])
-    return out
+    # Una sola comprension sobre todas las secciones; secciones ausentes o no-lista se saltan
+    return [
+        u
+        for urls in map(links_by_section.get, LINK_SECTIONS)
+        if isinstance(urls, list)
+        for u in urls
+        if isinstance(u, str)
+    ]
 
 
 def normalize_url_for_crawl(url: str) -> str:
@@ -69,29 +80,25 @@ def get_root_domain(url: str) -> str:
     """
     Devuelve un dominio raíz simple.
     Ejemplo: blog.fraccional.cl -> fraccional.cl
+             app.empresa.com.ar -> empresa.com.ar (no com.ar)
     """
-    p = urlparse(url)
-    host = (p.netloc or "").lower()
-    if host.startswith("www."):
-        host = host[4:]
-    parts = host.split(".")
-    if len(parts) >= 2:
-        return ".".join(parts[-2:])
-    return host
+    return registrable_domain(url_host(url))
 
 
 def is_same_root_domain(url: str, root_domain: str) -> bool:
-    p = urlparse(url)
-    host = (p.netloc or "").lower()
-    if host.startswith("www."):
-        host = host[4:]
-    return host == root_domain or host.endswith("." + root_domain)
+    return host_matches(url_host(url), root_domain)
 
 
-async def page_scraper(url_base: str):
+async def page_scraper(url_base: str, use_cache: bool = False):
     
-    #Traer HTML
-    html = await fetch_html(url_base)
+    #Traer HTML (use_cache=True pasa por html_cache: memoria + MongoDB, hasta 24h de antiguedad)
+    fetch = fetch_html_cached if use_cache else fetch_html
+    html = await fetch(url_base)
+
+    return build_page_object(html, url_base)
+
+
+def build_page_object(html: str, url_base: str) -> dict:
 
     #Dividir HTML
     splited_html = html_spliter_head_header_main_footer(html)
@@ -124,56 +131,65 @@ async def page_scraper(url_base: str):
     return page_object
 
 
-async def page_deep_scraper(url_base: str, max_pages: int = 100):
+async def page_deep_scraper(url_base: str, max_pages: int = 100, max_concurrency: int = 8, use_cache: bool = False):
     start = normalize_url_for_crawl(url_base)
     root_domain = get_root_domain(start)
 
-    to_visit: list[str] = [start]
+    to_visit: deque[str] = deque([start])
     visited: set[str] = set()
 
     pages: dict[str, dict] = {}
     all_internal_links: set[str] = set()
 
     while to_visit and len(visited) < max_pages:
-        current = to_visit.pop(0)
-        current = normalize_url_for_crawl(current)
-
-        if not current:
-            continue
-        if current in visited:
-            continue
-
-        visited.add(current)
-
-        try:
-            page_obj = await page_scraper(current)
-        except Exception as e:
-            pages[current] = {
-                "page": current,
-                "links": {},
-                "texts": {},
-                "error": {"type": type(e).__name__, "message": str(e)},
-            }
-            continue
-
-        pages[current] = page_obj
-
-        extracted_links = flatten_links(page_obj.get("links", {}))
-
-        normalized_links = []
-        for link in extracted_links:
-            nl = normalize_url_for_crawl(link)
-            if nl:
-                normalized_links.append(nl)
-
-        unique_links = set(normalized_links)
-
-        internal_links = [u for u in unique_links if is_same_root_domain(u, root_domain)]
-
-        for u in internal_links:
-            all_internal_links.add(u)
-            if u not in visited:
-                to_visit.append(u)
+        # Tomar del frente de la cola hasta max_concurrency urls nuevas (sin pasar max_pages)
+        batch: list[str] = []
+        while to_visit and len(batch) < max_concurrency and len(visited) < max_pages:
+            current = normalize_url_for_crawl(to_visit.popleft())
+            if not current or current in visited:
+                continue
+            visited.add(current)
+            batch.append(current)
+
+        # Traer el HTML del lote en paralelo; una url que falla entrega su excepcion
+        htmls = await fetch_html_batch(
+            batch,
+            max_concurrency=max_concurrency,
+            fetch=fetch_html_cached if use_cache else fetch_html,
+        )
+
+        for current, html in zip(batch, htmls):
+            try:
+                if isinstance(html, BaseException):
+                    raise html
+                page_obj = build_page_object(html, current)
+            except Exception as e:
+                pages[current] = {
+                    "page": current,
+                    "links": {},
+                    "texts": {},
+                    "error": {"type": type(e).__name__, "message": str(e)},
+                }
+                continue
+
+            pages[current] = page_obj
+
+            extracted_links = flatten_links(page_obj.get("links", {}))
+
+            normalized_links = []
+            for link in extracted_links:
+                nl = normalize_url_for_crawl(link)
+                if nl:
+                    normalized_links.append(nl)
+
+            unique_links = set(normalized_links)
+
+            internal_links = [u for u in unique_links if is_same_root_domain(u, root_domain)]
+
+            for u in internal_links:
+                all_internal_links.add(u)
+                if u not in visited:
+                    to_visit.append(u)
 
     return {
         "startUrl": start,
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from cachetools import TTLCache
+from pymongo.errors import PyMongoError
+
+from src.DB.mongo import get_async_db
+from src.scrapers.utils.requestHTTP import HTTPSettings, fetch_html
+
+
+# Collection used as second cache tier. Documents expire through a TTL index on createdAt.
+HTML_CACHE_COLLECTION = "html_cache"
+
+# How long a fetched page is reused (seconds). Re-crawls inside this window skip the network.
+HTML_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# In-process tier. Kept small because entries are full HTML pages.
+HTML_CACHE_MEMORY_SIZE = 256
+
+# Pages larger than this are not stored in MongoDB (16 MiB document limit).
+HTML_CACHE_MAX_CHARS = 4_000_000
+
+_memory_cache: TTLCache = TTLCache(maxsize=HTML_CACHE_MEMORY_SIZE, ttl=HTML_CACHE_TTL_SECONDS)
+_memory_lock = threading.Lock()
+_index_ready = False
+
+
+def cache_key(url: str, *, render_js: bool = False) -> str:
+    """
+    Content addressed key for a fetch.
+
+    The rendering mode is part of the key because a JS rendered DOM differs from the raw HTML.
+    """
+    raw = f"{'js' if render_js else 'http'}|{url.strip()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def _collection():
+    """
+    Return the cache collection, creating the TTL index on first use.
+    Errors propagate; callers treat them as a cache miss.
+    """
+    global _index_ready
+    col = get_async_db()[HTML_CACHE_COLLECTION]
+    if not _index_ready:
+        # Only marked ready on success, so a failed create_index is retried on the next call
+        await col.create_index("createdAt", expireAfterSeconds=HTML_CACHE_TTL_SECONDS)
+        _index_ready = True
+    return col
+
+
+async def fetch_html_cached(
+    url: str,
+    *,
+    settings: HTTPSettings | None = None,
+    referer: Optional[str] = None,
+    render_js: bool = False,
+    use_cache: bool = True,
+) -> str:
+    """
+    fetch_html with a two tier cache keyed by cache_key(url, render_js).
+
+    Lookup order
+    1) In-process TTLCache.
+    2) MongoDB collection html_cache.
+    3) Network via fetch_html, then write back to both tiers.
+
+    Notes
+    - Only successful fetches are cached. Errors propagate like in fetch_html.
+    - use_cache=False always hits the network (the fresh result is still stored).
+    - MongoDB failures never break the fetch: the cache is skipped. This includes a missing
+      Mongo config (RuntimeError from load_mongo_config), so scrapers still run without a DB.
+    """
+    key = cache_key(url, render_js=render_js)
+
+    if use_cache:
+        with _memory_lock:
+            html = _memory_cache.get(key)
+        if html is not None:
+            return html
+
+        try:
+            col = await _collection()
+            doc = await col.find_one({"_id": key}, {"_id": 0, "html": 1})
+        except (PyMongoError, RuntimeError):
+            doc = None
+        if doc and isinstance(doc.get("html"), str):
+            with _memory_lock:
+                _memory_cache[key] = doc["html"]
+            return doc["html"]
+
+    html = await fetch_html(url, settings=settings, referer=referer, render_js=render_js)
+
+    with _memory_lock:
+        _memory_cache[key] = html
+
+    if len(html) <= HTML_CACHE_MAX_CHARS:
+        try:
+            col = await _collection()
+            await col.replace_one(
+                {"_id": key},
+                {"url": url, "renderJs": render_js, "html": html, "createdAt": datetime.now(timezone.utc)},
+                upsert=True,
+            )
+        except (PyMongoError, RuntimeError):
+            pass
+
+    return html
+
+
+def clear_memory_cache() -> None:
+    """
+    Drop the in-process tier (MongoDB entries expire on their own).
+    """
+    with _memory_lock:
+        _memory_cache.clear()
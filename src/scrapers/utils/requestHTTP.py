@@ -3,9 +3,10 @@ from __future__ import annotations
 import asyncio
 import gzip
 import time
+import weakref
 import zlib
 from dataclasses import dataclass
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from urllib.parse import urlparse
 import brotli
 import httpx
@@ -97,18 +98,17 @@ class HostRateLimiter:
 
         Steps
         1) Read current monotonic time.
-        2) Compute elapsed time since last request to this host.
-        3) Sleep if needed.
-        4) Record the time for the next call.
+        2) Reserve the next free slot for this host (last slot + min_interval).
+        3) Record the slot before sleeping so concurrent callers queue behind it.
+        4) Sleep until the reserved slot.
         """
         now = time.monotonic()
-        last = self._last_by_host.get(host, 0.0)
-        elapsed = now - last
+        last = self._last_by_host.get(host)
+        slot = now if last is None else max(now, last + self.min_interval)
+        self._last_by_host[host] = slot
 
-        if elapsed < self.min_interval:
-            await asyncio.sleep(self.min_interval - elapsed)
-
-        self._last_by_host[host] = time.monotonic()
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
 
 def _normalize_url(url: str) -> str:
@@ -170,6 +170,62 @@ def _default_headers(settings: HTTPSettings, referer: Optional[str] = None) -> d
     return h
 
 
+# One AsyncClient per (event loop, settings)
+# Reusing it keeps TCP/TLS connections plus HTTP/2 sessions alive between requests
+# instead of paying the handshake on every fetch. Clients are bound to the loop that created them.
+_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[HTTPSettings, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+
+
+def _get_http_client(settings: HTTPSettings) -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the running loop plus these settings.
+
+    The client is created lazily on first use. Referer is not part of the
+    client headers because it changes per request.
+    """
+    loop = asyncio.get_running_loop()
+    per_loop = _HTTP_CLIENTS.get(loop)
+    if per_loop is None:
+        per_loop = {}
+        _HTTP_CLIENTS[loop] = per_loop
+
+    client = per_loop.get(settings)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.timeout_seconds),
+            headers=_default_headers(settings),
+            follow_redirects=settings.follow_redirects,
+            http2=True,
+        )
+        per_loop[settings] = client
+    return client
+
+
+async def aclose_http_clients() -> None:
+    """
+    Close the shared AsyncClients created on the running loop.
+
+    Async callers that own their loop should await this before the loop ends.
+    The sync wrappers call it automatically.
+    """
+    per_loop = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None) or {}
+    for client in per_loop.values():
+        await client.aclose()
+
+
+def _run_sync(coro):
+    """
+    Run a coroutine in a new event loop plus close the shared clients of that loop.
+    """
+    async def _with_cleanup():
+        try:
+            return await coro
+        finally:
+            await aclose_http_clients()
+
+    return asyncio.run(_with_cleanup())
+
+
 def _looks_like_html(content_type: Optional[str]) -> bool:
     """
     Lightweight check to decide whether the response is likely HTML.
@@ -357,6 +413,7 @@ async def _fetch_with_httpx_compressed(
       This prevents "double decompress" bugs later in decompress_html_result.
 
     What this function handles
+    - Shared keep-alive client per event loop (see _get_http_client)
     - Browser like headers
     - Redirects when enabled
     - Soft rate limiting per host
@@ -364,79 +421,73 @@ async def _fetch_with_httpx_compressed(
     - Size limits
     - Content-Type sanity check for HTML
     """
-    headers = _default_headers(settings, referer=referer)
-    timeout = httpx.Timeout(settings.timeout_seconds)
+    client = _get_http_client(settings)
+    request_headers = {"Referer": referer} if referer else None
 
-    async with httpx.AsyncClient(
-        timeout=timeout,
-        headers=headers,
-        follow_redirects=settings.follow_redirects,
-        http2=True,
-    ) as client:
-        last_err: Optional[Exception] = None
+    last_err: Optional[Exception] = None
 
-        for attempt in range(1, settings.max_retries + 1):
-            try:
-                # Respect per-host rate limiting
-                await limiter.wait(host)
-
-                # Stream the response so we can read raw bytes exactly as delivered
-                async with client.stream("GET", url) as r:
-                    status = r.status_code
-
-                    # Treat typical transient errors as retryable
-                    if status in (429, 500, 502, 503, 504):
-                        raise RequestHTTPError(f"HTTP {status}")
-
-                    content_type = r.headers.get("content-type")
-                    if not _looks_like_html(content_type):
-                        raise RequestHTTPError(f"Content-Type not HTML: {content_type}")
-
-                    # Collect raw bytes without automatic decoding
-                    chunks: list[bytes] = []
-                    total = 0
-
-                    async for chunk in r.aiter_raw():
-                        if not chunk:
-                            continue
-
-                        total += len(chunk)
-
-                        # Enforce size cap to protect memory
-                        if total > settings.max_response_bytes:
-                            remaining = settings.max_response_bytes - (total - len(chunk))
-                            if remaining > 0:
-                                chunks.append(chunk[:remaining])
-                            break
-
-                        chunks.append(chunk)
-
-                    raw = b"".join(chunks)
-
-                    hdrs = {k.lower(): v for k, v in r.headers.items()}
-                    final_url = str(r.url)
-
-                    return CompressedHTTPResult(
-                        url=url,
-                        final_url=_normalize_url(final_url),
-                        status_code=status,
-                        headers=hdrs,
-                        body=raw,
-                    )
-
-            except Exception as e:
-                last_err = e
-                if attempt >= settings.max_retries:
-                    break
-
-                # Exponential backoff between attempts
-                sleep_s = min(
-                    settings.backoff_base_seconds * (2 ** (attempt - 1)),
-                    settings.backoff_max_seconds,
+    for attempt in range(1, settings.max_retries + 1):
+        try:
+            # Respect per-host rate limiting
+            await limiter.wait(host)
+
+            # Stream the response so we can read raw bytes exactly as delivered
+            async with client.stream("GET", url, headers=request_headers) as r:
+                status = r.status_code
+
+                # Treat typical transient errors as retryable
+                if status in (429, 500, 502, 503, 504):
+                    raise RequestHTTPError(f"HTTP {status}")
+
+                content_type = r.headers.get("content-type")
+                if not _looks_like_html(content_type):
+                    raise RequestHTTPError(f"Content-Type not HTML: {content_type}")
+
+                # Collect raw bytes without automatic decoding
+                chunks: list[bytes] = []
+                total = 0
+
+                async for chunk in r.aiter_raw():
+                    if not chunk:
+                        continue
+
+                    total += len(chunk)
+
+                    # Enforce size cap to protect memory
+                    if total > settings.max_response_bytes:
+                        remaining = settings.max_response_bytes - (total - len(chunk))
+                        if remaining > 0:
+                            chunks.append(chunk[:remaining])
+                        break
+
+                    chunks.append(chunk)
+
+                raw = b"".join(chunks)
+
+                hdrs = {k.lower(): v for k, v in r.headers.items()}
+                final_url = str(r.url)
+
+                return CompressedHTTPResult(
+                    url=url,
+                    final_url=_normalize_url(final_url),
+                    status_code=status,
+                    headers=hdrs,
+                    body=raw,
                 )
-                await asyncio.sleep(sleep_s)
 
-        raise RequestHTTPError(f"Could not fetch from {url}. Error: {last_err}")
+        except Exception as e:
+            last_err = e
+            if attempt >= settings.max_retries:
+                break
+
+            # Exponential backoff between attempts
+            sleep_s = min(
+                settings.backoff_base_seconds * (2 ** (attempt - 1)),
+                settings.backoff_max_seconds,
+            )
+            await asyncio.sleep(sleep_s)
+
+    raise RequestHTTPError(f"Could not fetch from {url}. Error: {last_err}")
 
 
 async def _fetch_with_playwright_text(
@@ -499,7 +550,7 @@ def fetch_html_compressed_sync(
     Returns
     - CompressedHTTPResult containing raw bytes.
     """
-    return asyncio.run(
+    return _run_sync(
         fetch_html_compressed(
             url,
             settings=settings,
@@ -537,6 +588,34 @@ async def fetch_html(
     return decompress_html_result(compressed)
 
 
+async def fetch_html_batch(
+    urls: list[str],
+    *,
+    max_concurrency: int = 8,
+    settings: HTTPSettings | None = None,
+    referer: Optional[str] = None,
+    render_js: bool = False,
+    fetch: Callable[..., Awaitable[str]] | None = None,
+) -> list[str | Exception]:
+    """
+    Fetch many URLs concurrently with at most max_concurrency requests in flight.
+
+    Behavior
+    - Results keep the order of urls.
+    - A failed URL returns its exception in place instead of failing the whole batch.
+    - The per host rate limit still applies, so only different hosts run in parallel.
+    - fetch replaces fetch_html per URL (same keywords), e.g. html_cache.fetch_html_cached.
+    """
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    fetch_one = fetch or fetch_html
+
+    async def _one(u: str) -> str:
+        async with sem:
+            return await fetch_one(u, settings=settings, referer=referer, render_js=render_js)
+
+    return await asyncio.gather(*(_one(u) for u in urls), return_exceptions=True)
+
+
 def fetch_html_sync(
     url: str,
     *,
@@ -550,7 +629,7 @@ def fetch_html_sync(
     Returns
     - Final HTML as text.
     """
-    return asyncio.run(fetch_html(url, settings=settings, referer=referer, render_js=render_js))
+    return _run_sync(fetch_html(url, settings=settings, referer=referer, render_js=render_js))
 
 
 
@@ -578,6 +657,20 @@ fetch_html_sync
   -render_js: Boolean. Same behavior as in fetch_html. When True it triggers Playwright rendering. When False it uses direct HTTP fetching.
 
 
+fetch_html_batch
+-Function: fetch_html_batch
+-Description: Asynchronous helper that fetches a list of URLs concurrently. At most max_concurrency requests are in flight at once (asyncio.Semaphore) plus the per host rate limit still applies.
+-Input: urls: List of strings.
+-Output: List with one entry per URL in the same order: the HTML string or the exception raised for that URL.
+-Options:
+  -max_concurrency: Integer. Maximum number of simultaneous requests. Default 8.
+  -settings, referer, render_js: Same behavior as in fetch_html.
+  -fetch: Coroutine function used per URL instead of fetch_html, called with the same keywords. Lets callers plug in fetch_html_cached.
+
+aclose_http_clients
+-Function: aclose_http_clients
+-Description: Closes the shared httpx clients created on the running event loop. The sync wrappers call it automatically; async scripts that run their own loop should await it before finishing.
+
 "fetch_html_compressed" and "fetch_html_compressed_sync" do the same but with a comprimed output
 "decompress_html_result" decompress comprimed HTML
 """
\ No newline at end of file
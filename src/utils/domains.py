@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+
+# Segundos niveles genericos bajo un ccTLD (ej: empresa.com.ar, empresa.co.uk, municipio.gob.cl)
+# En esos casos el dominio registrable tiene 3 etiquetas, no 2
+_GENERIC_SLDS = frozenset(("com", "net", "org", "gob", "gov", "edu", "co", "ac", "mil", "nom", "ltd", "plc"))
+
+
+# Caso comun "scheme://host[:puerto][/?#...]" con host ASCII simple: el host sale de un solo match
+# Sin "@" (credenciales), "[" (IPv6), "%" (zone id) ni espacios/controles: esos casos van a urlsplit
+_PLAIN_HOST_RE = re.compile(
+    r"[A-Za-z][A-Za-z0-9+.\-]*://([A-Za-z0-9._~!$&'()*+,;=\-]*)(?::[0-9]*)?(?:[/?#][^\t\r\n]*)?\Z"
+)
+
+
+@lru_cache(maxsize=65536)
+def url_host(url: str) -> str:
+    """
+    Host de una URL: minusculas, sin puerto, sin credenciales y sin "www.".
+
+    urlsplit(...).hostname hace el lowercase y quita puerto/credenciales en una pasada.
+    Retorna string vacio si la URL no trae scheme o no se puede parsear.
+    Las URLs simples se resuelven con _PLAIN_HOST_RE (mismo resultado, sin armar un SplitResult).
+
+    Ejemplos:
+        url_host("https://WWW.Reity.cl:443/x")  -> "reity.cl"
+        url_host("reity.cl/x")                  -> ""
+    """
+    m = _PLAIN_HOST_RE.match(url)
+    if m is not None:
+        host = m.group(1).lower()
+    else:
+        try:
+            host = urlsplit(url).hostname or ""
+        except ValueError:
+            return ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def registrable_domain(host: str) -> str:
+    """
+    Dominio raiz (eTLD+1) aproximado de un host, sin depender de la Public Suffix List.
+
+    Ejemplos:
+        registrable_domain("blog.fraccional.cl")     -> "fraccional.cl"
+        registrable_domain("app.empresa.com.ar")     -> "empresa.com.ar"
+    """
+    parts = host.split(".")
+    if len(parts) >= 3 and len(parts[-1]) == 2 and parts[-2] in _GENERIC_SLDS:
+        return ".".join(parts[-3:])
+    if len(parts) >= 2:
+        return ".".join(parts[-2:])
+    return host
+
+
+def host_matches(host: str, domain: str) -> bool:
+    """
+    True si host es domain o un subdominio de domain (comparando por etiquetas).
+
+    Equivale a host == domain or host.endswith("." + domain), pero sin armar
+    el string "." + domain en cada llamada (se usa en loops de clasificacion).
+
+    Ejemplos:
+        host_matches("blog.reity.cl", "reity.cl")  -> True
+        host_matches("reity.cl", "reity.cl")       -> True
+        host_matches("notreity.cl", "reity.cl")    -> False
+    """
+    if not host.endswith(domain):
+        return False
+    dn = len(domain)
+    return len(host) == dn or host[-dn - 1] == "."
+
+
+# Resultado de DomainTrie.match cuando ningun sufijo calza (compartido)
+_NO_CATEGORIES = frozenset()
+
+
+# Indice de dominios -> categorias.
+# Un host calza con un dominio d si host == d o host termina en "." + d,
+# o sea si d es uno de sus sufijos por labels.
+# Se guarda como trie de labels invertidos (com -> linkedin -> ...): un host se recorre
+# una sola vez desde el TLD, sin armar strings de sufijos, y corta apenas no hay rama.
+class DomainTrie:
+    __slots__ = ("children", "categories")
+
+    def __init__(self):
+        self.children = {}
+        self.categories = None
+
+    def insert(self, domain, category):
+        node = self
+        for label in reversed(domain.split(".")):
+            node = node.children.setdefault(label, DomainTrie())
+        # frozenset por nodo terminal: match puede retornarlo tal cual, sin copiar
+        node.categories = (node.categories or _NO_CATEGORIES) | {category}
+
+    def match(self, host):
+        # Todas las categorias de los dominios que son sufijo del host
+        # Caso comun (ninguno o un solo sufijo registrado): sin armar sets nuevos
+        found = _NO_CATEGORIES
+        node = self
+        for label in reversed(host.split(".")):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.categories:
+                found = found | node.categories if found else node.categories
+        return found
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 import os
@@ -10,8 +11,9 @@ project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.DB.mongo import get_db
-from src.analizers.datasource_role_classifier import classify_role_platform_datasources
+from src.DB.mongo import get_db, close_async_client
+from src.DB.bulk import iter_docs
+from src.analizers.datasource_role_classifier import aclassify_role_platform_datasources
 
 # Setup logging
 log_dir = os.path.join(project_root, 'logs')
@@ -28,6 +30,58 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Empresas clasificadas en paralelo. Cada una espera sobre todo a MongoDB (lectura + bulk_write),
+# asi que varias en vuelo solapan esa latencia sin saturar el pool de conexiones (Motor)
+MAX_CONCURRENCY = 16
+
+async def _classify_company(i: int, total: int, company: dict, target_roles: Optional[List[str]]) -> Optional[int]:
+    """
+    Clasifica los datasources de una empresa y loguea el resultado.
+    Retorna la cantidad de datasources actualizados, o None si hubo error.
+    """
+    slug = company.get("slug")
+    name = company.get("name", "Unknown")
+
+    logger.info(f"[{i}/{total}] Processing '{name}' (slug: {slug})...")
+
+    try:
+        # Call the classifier
+        result = await aclassify_role_platform_datasources(slug=slug, target_roles=target_roles)
+    except Exception as e:
+        logger.error(f"Error classifying platform '{slug}': {e}", exc_info=True)
+        return None
+
+    if result.get("error"):
+        logger.warning(f"[{slug}] Result error: {result.get('error')}")
+        return 0
+
+    updated = result.get("updated", 0)
+    classified = result.get("classified", 0)
+    total_ds = result.get("processed", 0)
+
+    if updated > 0:
+        logger.info(f"[{slug}] -> Updated {updated} datasources (Classified: {classified}/{total_ds})")
+    else:
+        logger.info(f"[{slug}] -> No changes (Classified: {classified}/{total_ds})")
+    return updated
+
+async def _classify_companies(companies: List[dict], target_roles: Optional[List[str]]) -> List[Optional[int]]:
+    """
+    Corre _classify_company sobre Motor con a lo mas MAX_CONCURRENCY en vuelo.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    total = len(companies)
+
+    async def _one(i: int, company: dict) -> Optional[int]:
+        async with sem:
+            return await _classify_company(i, total, company, target_roles)
+
+    try:
+        return await asyncio.gather(*(_one(i, c) for i, c in enumerate(companies, 1)))
+    finally:
+        # El cliente Motor queda ligado a este loop (asyncio.run lo cierra al salir)
+        close_async_client()
+
 def process_active_companies(target_roles: Optional[List[str]] = None):
     """
     Recupera todas las empresas cuyo operational.status NO sea "inactive"
@@ -52,8 +106,7 @@ def process_active_companies(target_roles: Optional[List[str]] = None):
         # We only need the slug to call the classifier
         projection = {"slug": 1, "name": 1, "_id": 1}
         
-        cursor = platforms_collection.find(query, projection)
-        companies_list = list(cursor)
+        companies_list = list(iter_docs(platforms_collection, query, projection))
         
         total_companies = len(companies_list)
         logger.info(f"Found {total_companies} platforms to process.")
@@ -64,38 +117,19 @@ def process_active_companies(target_roles: Optional[List[str]] = None):
             "errors": 0
         }
         
-        for i, company in enumerate(companies_list, 1):
-            slug = company.get("slug")
-            name = company.get("name", "Unknown")
-            
-            if not slug:
+        with_slug = []
+        for company in companies_list:
+            if not company.get("slug"):
                 logger.warning(f"Skipping platform ID {company.get('_id')} - No slug found.")
                 continue
-            
-            logger.info(f"[{i}/{total_companies}] Processing '{name}' (slug: {slug})...")
-            
-            try:
-                # Call the classifier
-                result = classify_role_platform_datasources(slug=slug, target_roles=target_roles)
-                
-                if result.get("error"):
-                    logger.warning(f"[{slug}] Result error: {result.get('error')}")
-                else:
-                    updated = result.get("updated", 0)
-                    classified = result.get("classified", 0)
-                    total_ds = result.get("processed", 0)
-                    
-                    if updated > 0:
-                        logger.info(f"[{slug}] -> Updated {updated} datasources (Classified: {classified}/{total_ds})")
-                        stats_summary["total_updates"] += updated
-                    else:
-                        logger.info(f"[{slug}] -> No changes (Classified: {classified}/{total_ds})")
-                
-                stats_summary["processed_companies"] += 1
-                
-            except Exception as e:
-                logger.error(f"Error classifying platform '{slug}': {e}", exc_info=True)
+            with_slug.append(company)
+
+        for updated in asyncio.run(_classify_companies(with_slug, target_roles)):
+            if updated is None:
                 stats_summary["errors"] += 1
+            else:
+                stats_summary["total_updates"] += updated
+                stats_summary["processed_companies"] += 1
                 
         logger.info("Classification process finished.")
         logger.info(f"Summary: {stats_summary}")
@@ -1,4 +1,5 @@
 
+import asyncio
 import logging
 import sys
 import os
@@ -10,7 +11,8 @@ current_dir = Path(__file__).resolve().parent
 src_path = current_dir.parent.parent
 sys.path.append(str(src_path))
 
-from src.DB.platforms_querys import get_slugs_not_inactive, manage_primary_domain, upsert_page_routes
+from src.DB.mongo import close_async_client
+from src.DB.platforms_querys import get_slugs_not_inactive, aget_platforms_by_slugs, upsert_page_routes
 from src.scrapers.favicon_scraper import get_favicon_url
 
 # Configurar Logging
@@ -26,6 +28,17 @@ logging.basicConfig(
     ]
 )
 
+async def _fetch_primary_domains(slugs):
+    """
+    Lee primaryDomain de todas las plataformas en paralelo.
+    Cada slug queda aislado: si su lectura falla se entrega la excepcion en su lugar.
+    """
+    try:
+        return await aget_platforms_by_slugs(slugs, {"_id": 0, "primaryDomain": 1}, return_exceptions=True)
+    finally:
+        # El cliente Motor queda ligado a este loop (asyncio.run lo cierra al salir)
+        close_async_client()
+
 def process_favicons():
     logging.info("INICIANDO: Workflow de Extracción de Favicons")
     
@@ -33,6 +46,9 @@ def process_favicons():
     slugs = get_slugs_not_inactive()
     logging.info(f"Se encontraron {len(slugs)} plataformas activas/no-inactivas.")
     
+    # 2. Obtener Primary Domain de todas las plataformas en paralelo
+    docs = asyncio.run(_fetch_primary_domains(slugs))
+
     success_count = 0
     fail_count = 0
     skip_count = 0
@@ -41,8 +57,13 @@ def process_favicons():
 
     for i, slug in enumerate(slugs, 1):
         try:
-            # 2. Obtener Primary Domain
-            primary_domain = manage_primary_domain(slug, action="get")
+            doc = docs.get(slug)
+            if isinstance(doc, BaseException):
+                logging.error(f"[{i}/{total_slugs}] FALLO [{slug}]: error leyendo la plataforma: {doc}")
+                fail_count += 1
+                continue
+
+            primary_domain = doc.get("primaryDomain") if doc else None
             
             if not primary_domain:
                 logging.warning(f"[{i}/{total_slugs}] SKIP [{slug}]: No tiene primaryDomain.")
@@ -5,6 +5,7 @@ import csv
 import asyncio
 from src.DB.mongo import get_db
 from src.scrapers.model_builder import from_url_model
+from src.scrapers.utils.requestHTTP import aclose_http_clients
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -120,7 +121,15 @@ async def main():
                 logger.info("-" * 50)
 
 
+async def run():
+    #Cierra los clientes HTTP compartidos al terminar
+    try:
+        await main()
+    finally:
+        await aclose_http_clients()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(run())
 
 
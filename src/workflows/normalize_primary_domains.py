@@ -5,7 +5,9 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from src.utils.logger import setup_logger
-from src.DB.platforms_querys import get_all_slugs, manage_primary_domain
+from src.DB.mongo import get_db
+from src.DB.bulk import iter_docs_prefetch
+from src.DB.writer import parallel_write
 
 # Configuración del Logger
 # Se guarda en un archivo específico para este proceso
@@ -15,10 +17,18 @@ logger = setup_logger('normalize_primary_domains', LOG_FILE)
 def main():
     logger.info("INICIANDO PROCESO DE NORMALIZACION DE PRIMARY DOMAINS")
     
-    # Obtener todos los slugs, incluyendo aquellos que puedan tener datos vacíos
+    # Todos los documentos con slug string, incluyendo aquellos que puedan tener datos vacíos
     # para asegurar revisión completa
-    slugs = get_all_slugs(include_empty=True)
-    logger.info(f"Se encontraron {len(slugs)} documentos para revisar.")
+    platforms = get_db()["platforms"]
+    query = {"slug": {"$type": "string"}}
+    logger.info(f"Se encontraron {platforms.count_documents(query)} documentos para revisar.")
+
+    # Una sola lectura de slug + primaryDomain (en vez de un find_one por slug); el prefetch
+    # trae la pagina siguiente mientras se revisan y loguean los documentos de la actual
+    docs = iter_docs_prefetch(platforms, query, {"_id": 1, "slug": 1, "primaryDomain": 1})
+    
+    # Updates a aplicar al final, en paralelo (ver src/DB/writer.py); filtro por _id del documento
+    specs = []
     
     stats = {
         "processed": 0,
@@ -28,12 +38,13 @@ def main():
         "errors": 0
     }
     
-    for slug in slugs:
+    for doc in docs:
+        slug = doc["slug"]
         try:
             stats["processed"] += 1
             
-            # Obtener primaryDomain actual
-            current_domain = manage_primary_domain(slug, action="get")
+            # primaryDomain actual
+            current_domain = doc.get("primaryDomain")
             
             # Caso 1: Documento sin primaryDomain o es None
             if current_domain is None:
@@ -51,7 +62,7 @@ def main():
             
             # Caso 2: String vacío -> Eliminar campo
             if stripped_domain == "":
-                manage_primary_domain(slug, action="delete")
+                specs.append({"filter": {"_id": doc["_id"]}, "update": {"$unset": {"primaryDomain": ""}}})
                 logger.info(f"SLUG: {slug} - ACTION: ELIMINADO - DETAILS: Campo estaba vacío, se eliminó del documento")
                 stats["deleted_empty"] += 1
                 continue
@@ -66,7 +77,7 @@ def main():
             # Caso 4: Agregar https://
             # Nota: Asumimos que si llegó acá es un dominio "dominio.com" sin protocolo
             new_domain = "https://" + stripped_domain
-            manage_primary_domain(slug, action="set", domain=new_domain)
+            specs.append({"filter": {"_id": doc["_id"]}, "update": {"$set": {"primaryDomain": new_domain}}})
             
             logger.info(f"SLUG: {slug} - ACTION: ACTUALIZADO - DETAILS: '{current_domain}' -> '{new_domain}'")
             stats["updated_https"] += 1
@@ -75,6 +86,15 @@ def main():
             logger.error(f"SLUG: {slug} - ERROR CRITICO: {str(e)}")
             stats["errors"] += 1
             
+    # Escribir todos los cambios (bulk_write por batch, repartidos entre procesos)
+    if specs:
+        try:
+            res = parallel_write("platforms", specs)
+            logger.info(f"Cambios escritos en la DB: matched={res['matched']}, modified={res['modified']}")
+        except Exception as e:
+            logger.error(f"ERROR CRITICO escribiendo {len(specs)} cambios: {str(e)}")
+            stats["errors"] += len(specs)
+            
     # Resumen final
     logger.info("="*50)
     logger.info("RESUMEN DEL PROCESO")
@@ -10,7 +10,10 @@ project_root = os.path.abspath(os.path.join(current_dir, '../../'))
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+from pymongo import UpdateOne
 from src.DB.platforms_querys import platforms
+from src.DB.bulk import iter_docs
+from src.DB.write_queue import WriteQueue
 from src.analizers.store_links_selector import analyze_store_links, verify_links_existence, format_store_links_for_model
 
 # Setup logging
@@ -41,70 +44,68 @@ def process_store_links():
     try:
         # Get total count for progress tracking
         total_platforms = platforms.count_documents(query)
-        cursor = platforms.find(query, projection)
+        # Se materializa (solo slug + dataSources): el scraping por plataforma es lento
+        # y un cursor abierto podria expirar en el servidor entre getMore
+        cursor = list(iter_docs(platforms, query, projection))
         
         logging.info(f"Found {total_platforms} platforms to process (status != 'inactive').")
         
         processed_count = 0
-        updated_count = 0
         
-        for doc in cursor:
-            slug = doc.get('slug')
-            data_sources = doc.get('dataSources', [])
+        # WriteQueue agrupa los updates en bulk_write desde un thread mientras se verifican
+        # los links; al salir del with (tambien ante una excepcion o Ctrl-C) escribe lo pendiente
+        with WriteQueue(platforms, workers=1) as wq:
+            for doc in cursor:
+                slug = doc.get('slug')
+                data_sources = doc.get('dataSources', [])
             
-            if not slug:
-                continue
+                if not slug:
+                    continue
             
-            logging.info(f"Processing platform: {slug}")
+                logging.info(f"Processing platform: {slug}")
             
-            # 2. Find all urls with role: "store_listing"
-            store_listing_urls = []
-            if isinstance(data_sources, list):
-                for ds in data_sources:
-                    if isinstance(ds, dict) and ds.get('role') == 'store_listing':
-                        url = ds.get('url')
-                        if url and isinstance(url, str):
-                            store_listing_urls.append(url)
+                # 2. Find all urls with role: "store_listing"
+                store_listing_urls = []
+                if isinstance(data_sources, list):
+                    for ds in data_sources:
+                        if isinstance(ds, dict) and ds.get('role') == 'store_listing':
+                            url = ds.get('url')
+                            if url and isinstance(url, str):
+                                store_listing_urls.append(url)
             
-            logging.info(f"  Found {len(store_listing_urls)} raw store_listing inputs.")
+                logging.info(f"  Found {len(store_listing_urls)} raw store_listing inputs.")
 
-            # 3. Pipeline
-            # analyze_store_links -> verify_links_existence -> format_store_links_for_model
+                # 3. Pipeline
+                # analyze_store_links -> verify_links_existence -> format_store_links_for_model
             
-            # Step A: Analyze and select candidates
-            analyzed_urls = analyze_store_links(store_listing_urls)
+                # Step A: Analyze and select candidates
+                analyzed_urls = analyze_store_links(store_listing_urls)
             
-            # Step B: Verify they actually exist (HTTP 200)
-            verified_urls = verify_links_existence(analyzed_urls)
+                # Step B: Verify they actually exist (HTTP 200)
+                verified_urls = verify_links_existence(analyzed_urls)
             
-            # Step C: Format for DB
-            output = format_store_links_for_model(verified_urls)
+                # Step C: Format for DB
+                output = format_store_links_for_model(verified_urls)
             
-            # 4. Save to DB
-            # We always save the output, even if empty, to reflect the current reality
-            # (e.g. if it had apps before but now links are dead, it should be updated)
+                # 4. Save to DB
+                # We always save the output, even if empty, to reflect the current reality
+                # (e.g. if it had apps before but now links are dead, it should be updated)
             
-            try:
                 if output:
-                    platforms.update_one(
-                        {"slug": slug}, 
-                        {"$set": {"mobileApps": output}}
-                    )
-                    logging.info(f"  -> Saved {len(output)} apps: {output}")
-                    updated_count += 1
+                    wq.put(UpdateOne({"slug": slug}, {"$set": {"mobileApps": output}}))
+                    logging.info(f"  -> Queued {len(output)} apps: {output}")
                 else:
                     logging.info(f"  -> No valid apps found. Skipping DB update.")
-                    
-            except Exception as e:
-                logging.error(f"  Error updating database for {slug}: {e}")
 
-            processed_count += 1
-            if processed_count % 10 == 0:
-                logging.info(f"Progress: {processed_count}/{total_platforms}")
+                processed_count += 1
+                if processed_count % 10 == 0:
+                    logging.info(f"Progress: {processed_count}/{total_platforms}")
 
         logging.info("Workflow completed successfully.")
         logging.info(f"Total Processed: {processed_count}")
-        logging.info(f"Companies with apps found: {updated_count}")
+        logging.info(f"Companies with apps saved: {wq.totals['matched']}")
+        if wq.totals["failed"]:
+            logging.error(f"Failed updates: {wq.totals['failed']}")
         logging.info(f"Logs saved to: {log_file}")
         
     except Exception as e: